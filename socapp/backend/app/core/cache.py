@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Sync routes run in the AnyIO threadpool, so every operation takes a lock.
+    Hit/miss counters are kept for observability via `stats()`. With `tag_of`,
+    keys are also indexed by tag so `invalidate_tag` costs O(entries for that
+    tag) instead of a scan of the whole cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 tag_of: Optional[Callable[[Hashable], Hashable]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tag_of = tag_of
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            if self._tag_of is not None:
+                self._tags.setdefault(self._tag_of(key), set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._discard(next(iter(self._data)))
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, value) is true; returns the count."""
+        with self._lock:
+            doomed = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                self._discard(k)
+            return len(doomed)
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Drop every entry whose key maps to `tag`; returns the count."""
+        with self._lock:
+            keys = self._tags.pop(tag, ())
+            for k in keys:
+                self._data.pop(k, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def _discard(self, key: Hashable) -> None:
+        # Caller holds the lock
+        if self._data.pop(key, None) is None or self._tag_of is None:
+            return
+        tag = self._tag_of(key)
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
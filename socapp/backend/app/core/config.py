@@ -16,12 +16,95 @@ class Settings(BaseSettings):
     NEO4J_PASSWORD: str
     NEO4J_DATABASE: str = "neo4j"
 
+    # Neo4j connections per worker process, in total: split between the sync
+    # and async drivers (half each unless NEO4J_ASYNC_POOL_SIZE is set)
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = 50
+    NEO4J_ASYNC_POOL_SIZE: Optional[int] = None
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = 30.0
+    NEO4J_CONNECTION_TIMEOUT: float = 15.0
+    # Aura closes idle connections after ~60 minutes; recycle well before that
+    NEO4J_MAX_CONNECTION_LIFETIME: float = 1800.0
+    NEO4J_LIVENESS_CHECK_TIMEOUT: Optional[float] = 60.0
+
     # JWT
     JWT_SECRET: Optional[str] = None
     JWT_SECRET_KEY: Optional[str] = None
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Password hashing runs on its own thread pool; beyond MAX_PENDING
+    # queued/running hashes, auth routes answer 503 instead of piling up
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Rows per transaction for migration backfills
+    MIGRATION_BATCH_SIZE: int = 1000
+
+    # Background repair of denormalized like/comment, follow and unread counters (0 disables)
+    COUNTER_RECONCILE_INTERVAL_SECONDS: float = 3600.0
+    COUNTER_RECONCILE_BATCH_SIZE: int = 500
+
+    # Home timelines: fan-out-on-write into bounded per-follower timelines,
+    # except for authors above FANOUT_MAX_FOLLOWERS (read from the graph)
+    TIMELINE_BACKEND: str = "memory"
+    TIMELINE_MAX_LENGTH: int = 800
+    TIMELINE_FANOUT_MAX_FOLLOWERS: int = 1000
+    # "memory" timelines are per worker and only see that worker's pushes, so
+    # each is rebuilt from the graph this long after it was built
+    TIMELINE_MEMORY_TTL_SECONDS: float = 60.0
+    TIMELINE_MEMORY_MAX_USERS: int = 10000
+
+    # In-memory username typeahead index (per worker); rebuilt from the graph
+    # on this interval so other workers' edits show up (0 = build once)
+    TYPEAHEAD_INDEX_ENABLED: bool = True
+    TYPEAHEAD_REBUILD_INTERVAL_SECONDS: float = 600.0
+
+    # Rendered responses of public GETs (posts, comments, profiles, follow
+    # lists), invalidated by write routes; 0 TTL keeps only ETag/304 handling
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+
+    # Uploads are streamed to disk in chunks; larger files are refused with 413
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # Sweep for blobs no Post/User references (0 disables); blobs younger
+    # than the grace period are kept so in-flight uploads are not collected
+    UPLOAD_GC_INTERVAL_SECONDS: float = 21600.0
+    UPLOAD_GC_GRACE_SECONDS: float = 3600.0
+    # Upload names are never reused for different bytes, so browsers may keep them
+    UPLOADS_CACHE_MAX_AGE_SECONDS: int = 31536000
+
+    # Resized WebP variants of uploaded images, built on a thread pool after
+    # the upload lands (needs Pillow); beyond MAX_PENDING jobs are skipped
+    IMAGE_VARIANTS_ENABLED: bool = True
+    IMAGE_WORKERS: int = 2
+    IMAGE_MAX_PENDING: int = 64
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_FEED_WIDTH: int = 720
+    IMAGE_AVATAR_SMALL: int = 96
+    IMAGE_AVATAR_MEDIUM: int = 256
+
+    # Socket.IO pub/sub queue shared by all workers (redis://, amqp://, or
+    # local:// for an in-process stand-in); unset keeps emits per worker
+    SOCKETIO_MESSAGE_QUEUE: Optional[str] = None
+    SOCKETIO_CHANNEL: str = "socapp-socketio"
+    # Cached positive conversation-membership checks for join_conversation
+    SOCKET_MEMBERSHIP_CACHE_SIZE: int = 8192
+    SOCKET_MEMBERSHIP_CACHE_TTL_SECONDS: float = 300.0
+
+    # /ws/chat room hub: membership shards, per-connection outbound queue,
+    # and what happens to a client that can't keep up ("evict" closes it
+    # with 1013, "drop_oldest" discards its oldest queued message)
+    CHAT_HUB_SHARDS: int = 16
+    CHAT_QUEUE_SIZE: int = 256
+    CHAT_SEND_TIMEOUT_SECONDS: float = 5.0
+    CHAT_SLOW_CONSUMER_POLICY: str = "evict"
+
+    # In-process cache of users resolved from JWT subjects
+    AUTH_USER_CACHE_SIZE: int = 4096
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+
     # Add PORT for Render
     PORT: int = 8000
 
@@ -29,6 +112,16 @@ class Settings(BaseSettings):
     FRONTEND_ORIGIN: Optional[str] = None
 
     # Helpers
+    @property
+    def async_pool_size(self) -> int:
+        total = max(2, self.NEO4J_MAX_CONNECTION_POOL_SIZE)
+        wanted = self.NEO4J_ASYNC_POOL_SIZE if self.NEO4J_ASYNC_POOL_SIZE is not None else total // 2
+        return min(max(1, wanted), total - 1)
+
+    @property
+    def sync_pool_size(self) -> int:
+        return max(2, self.NEO4J_MAX_CONNECTION_POOL_SIZE) - self.async_pool_size
+
     @property
     def auth_user(self) -> str:
         return self.NEO4J_USER or self.NEO4J_USERNAME or ""
@@ -0,0 +1,134 @@
+"""Maintenance of denormalized graph data (counters and pointers)."""
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import async_db
+
+logger = logging.getLogger(__name__)
+
+# Recount one batch of posts (keyset over p.id) and rewrite their counters.
+# `drifted` is evaluated before SET so we can report how many were repaired.
+_RECONCILE_POSTS_CYPHER = """
+MATCH (p:Post)
+WHERE p.id > $after
+WITH p ORDER BY p.id LIMIT $batch
+WITH p,
+     size([(p)<-[:LIKED]-(:User) | 1]) AS likes,
+     size([(:Comment)-[:ON_POST]->(p) | 1]) AS comments
+WITH p, likes, comments,
+     (p.likes_count IS NULL OR p.likes_count <> likes
+      OR p.comments_count IS NULL OR p.comments_count <> comments) AS drifted
+SET p.likes_count = likes, p.comments_count = comments
+RETURN max(p.id) AS last_id,
+       count(p) AS scanned,
+       sum(CASE WHEN drifted THEN 1 ELSE 0 END) AS repaired
+"""
+
+# Same keyset walk for User.followers_count / following_count
+_RECONCILE_USERS_CYPHER = """
+MATCH (u:User)
+WHERE u.id > $after
+WITH u ORDER BY u.id LIMIT $batch
+WITH u,
+     size([(u)<-[:FOLLOWS]-(:User) | 1]) AS followers,
+     size([(u)-[:FOLLOWS]->(:User) | 1]) AS following
+WITH u, followers, following,
+     (u.followers_count IS NULL OR u.followers_count <> followers
+      OR u.following_count IS NULL OR u.following_count <> following) AS drifted
+SET u.followers_count = followers, u.following_count = following
+RETURN max(u.id) AS last_id,
+       count(u) AS scanned,
+       sum(CASE WHEN drifted THEN 1 ELSE 0 END) AS repaired
+"""
+
+
+# Recount PARTICIPATES_IN.unread_count from the read watermark mark_read
+# writes: messages from others created after last_read_at. Participants who
+# never marked a conversation read have no watermark and are left alone.
+_RECONCILE_UNREAD_CYPHER = """
+MATCH (c:Conversation)
+WHERE c.id > $after
+WITH c ORDER BY c.id LIMIT $batch
+OPTIONAL MATCH (u:User)-[p:PARTICIPATES_IN]->(c)
+WHERE p.last_read_at IS NOT NULL
+WITH c, p,
+     size([(c)-[:HAS_MESSAGE]->(m:Message)
+           WHERE m.created_at > p.last_read_at AND m.sender_id <> u.id | 1]) AS unread
+WITH c, p, unread,
+     (p IS NOT NULL AND coalesce(p.unread_count, -1) <> unread) AS drifted
+SET p.unread_count = unread
+RETURN max(c.id) AS last_id,
+       count(DISTINCT c) AS scanned,
+       sum(CASE WHEN drifted THEN 1 ELSE 0 END) AS repaired
+"""
+
+# Re-point Conversation.LAST_MESSAGE / last_message_at at the newest remaining
+# message of each conversation in $cids (after message deletions).
+REPOINT_LAST_MESSAGE_CYPHER = """
+UNWIND $cids AS cid
+MATCH (c:Conversation {id: cid})
+OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()
+DELETE old
+WITH DISTINCT c
+CALL {
+    WITH c
+    OPTIONAL MATCH (c)-[:HAS_MESSAGE]->(m:Message)
+    RETURN m ORDER BY coalesce(m.timestamp, m.created_at) DESC LIMIT 1
+}
+SET c.last_message_at = coalesce(m.timestamp, m.created_at)
+FOREACH (_ IN CASE WHEN m IS NULL THEN [] ELSE [1] END | MERGE (c)-[:LAST_MESSAGE]->(m))
+"""
+
+
+async def _reconcile(cypher: str, batch_size: int | None) -> int:
+    batch = batch_size or settings.COUNTER_RECONCILE_BATCH_SIZE
+    after = ""
+    repaired = 0
+    while True:
+        rec = await async_db.run_single(cypher, after=after, batch=batch)
+        if not rec or not rec["scanned"]:
+            break
+        repaired += rec["repaired"] or 0
+        after = rec["last_id"]
+        if rec["scanned"] < batch:
+            break
+    return repaired
+
+
+async def reconcile_post_counters(batch_size: int | None = None) -> int:
+    """Repair Post.likes_count / comments_count drift in small batches.
+    Returns the number of posts whose stored counters were wrong.
+    """
+    return await _reconcile(_RECONCILE_POSTS_CYPHER, batch_size)
+
+
+async def reconcile_user_counters(batch_size: int | None = None) -> int:
+    """Repair User.followers_count / following_count drift in small batches."""
+    return await _reconcile(_RECONCILE_USERS_CYPHER, batch_size)
+
+
+async def reconcile_unread_counters(batch_size: int | None = None) -> int:
+    """Repair PARTICIPATES_IN.unread_count drift against last_read_at."""
+    return await _reconcile(_RECONCILE_UNREAD_CYPHER, batch_size)
+
+
+async def run_counter_reconciler() -> None:
+    """Background loop started from the app lifespan; never raises."""
+    interval = settings.COUNTER_RECONCILE_INTERVAL_SECONDS
+    while interval > 0:
+        try:
+            repaired = await reconcile_post_counters()
+            if repaired:
+                logger.info(f"Counter reconciliation repaired {repaired} posts")
+            repaired = await reconcile_user_counters()
+            if repaired:
+                logger.info(f"Counter reconciliation repaired {repaired} users")
+            repaired = await reconcile_unread_counters()
+            if repaired:
+                logger.info(f"Counter reconciliation repaired {repaired} unread counts")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Counter reconciliation failed: {e}")
+        await asyncio.sleep(interval)
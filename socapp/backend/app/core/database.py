@@ -1,28 +1,131 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from app.core.config import settings
 
+# ---------------------------------------------------------------------------
+# Driver registry
+# ---------------------------------------------------------------------------
+# Exactly one sync and one async driver per process, both built from the same
+# Settings. NEO4J_MAX_CONNECTION_POOL_SIZE is split between their pools, so it
+# bounds the Bolt connections each worker opens against Aura. Routers never
+# create drivers of their own; they go through `db` / `async_db` below.
+_driver = None
+_async_driver = None
+
+
+def _driver_uri() -> str:
+    return settings.NEO4J_URI.replace("neo4j+s://", "neo4j+ssc://")
+
+
+def _driver_options(pool_size: int) -> dict:
+    return {
+        "auth": (settings.auth_user, settings.NEO4J_PASSWORD),
+        "max_connection_pool_size": pool_size,
+        "connection_acquisition_timeout": settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "connection_timeout": settings.NEO4J_CONNECTION_TIMEOUT,
+        "max_connection_lifetime": settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        "liveness_check_timeout": settings.NEO4J_LIVENESS_CHECK_TIMEOUT,
+    }
+
+
+def get_driver():
+    """Return the process-wide sync driver, creating it on first use."""
+    global _driver
+    if _driver is None:
+        _driver = GraphDatabase.driver(_driver_uri(), **_driver_options(settings.sync_pool_size))
+    return _driver
+
+
+def get_async_driver():
+    """Return the process-wide async driver, creating it on first use."""
+    global _async_driver
+    if _async_driver is None:
+        _async_driver = AsyncGraphDatabase.driver(_driver_uri(), **_driver_options(settings.async_pool_size))
+    return _async_driver
+
+
+def close_driver():
+    global _driver
+    if _driver is not None:
+        _driver.close()
+        _driver = None
+
+
+async def close_async_driver():
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
+
+
+async def close_drivers():
+    """Close both pooled drivers. Called from the app lifespan on shutdown."""
+    await close_async_driver()
+    close_driver()
+
+
 class Neo4jConnection:
     def __init__(self):
-        
-        uri = settings.NEO4J_URI.replace("neo4j+s://", "neo4j+ssc://")
-        
-        print(f"Connecting to: {uri}") 
-        
-        self.driver = GraphDatabase.driver(
-            uri,
-            auth=(settings.auth_user, settings.NEO4J_PASSWORD)
-        )
-        
+
+        print(f"Connecting to: {_driver_uri()}")
+
         try:
             self.driver.verify_connectivity()
             print("✅ Successfully connected to Neo4j Aura")
         except Exception as e:
             print(f"❌ Connection failed: {e}")
 
+    @property
+    def driver(self):
+        return get_driver()
+
     def close(self):
-        self.driver.close()
+        close_driver()
+
+    def get_session(self):
+        return self.driver.session(database=settings.NEO4J_DATABASE)
+
+
+class AsyncNeo4jConnection:
+    """Awaitable counterpart of Neo4jConnection for `async def` routes.
+
+    Blocking sessions inside coroutines stall the event loop (and every
+    Socket.IO client with it), so async handlers must go through this one.
+    """
+
+    @property
+    def driver(self):
+        return get_async_driver()
+
+    async def close(self):
+        await close_async_driver()
 
     def get_session(self):
+        """Return an AsyncSession; use as `async with async_db.get_session() as session`."""
         return self.driver.session(database=settings.NEO4J_DATABASE)
 
-db = Neo4jConnection()
\ No newline at end of file
+    async def run_query(self, cypher: str, **params) -> list:
+        """Run a query and return all records, materialized inside the session."""
+        async with self.get_session() as session:
+            result = await session.run(cypher, **params)
+            return [record async for record in result]
+
+    async def run_single(self, cypher: str, **params):
+        """Run a query and return its single record (or None)."""
+        async with self.get_session() as session:
+            result = await session.run(cypher, **params)
+            return await result.single()
+
+    async def write_single(self, cypher: str, **params):
+        """Run a write statement in a managed transaction and return its single
+        record (or None). The driver retries transient failures for us.
+        """
+        async def work(tx):
+            result = await tx.run(cypher, **params)
+            return await result.single()
+
+        async with self.get_session() as session:
+            return await session.execute_write(work)
+
+
+db = Neo4jConnection()
+async_db = AsyncNeo4jConnection()
@@ -0,0 +1,163 @@
+"""Background derivatives (resized WebP variants) of uploaded images.
+
+After an upload is stored and its node written, the route schedules a job on
+a small thread pool. Each variant is written next to the original as
+`<sha256>_<variant>.webp`, without EXIF (orientation is applied first), and
+its URL is recorded on the node as long as the node still points at the same
+original. Routes keep serving the original until that write lands.
+
+Pillow is optional: without it no variants are produced.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+from app.core.config import settings
+from app.core.database import async_db
+from app.core.response_cache import invalidate, post_tag, user_tag
+from app.core.security import invalidate_cached_user
+from app.core.typeahead import username_index
+from app.core.uploads import UPLOADS_DIR, temp_upload_path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# node property -> (file suffix, pixel size, square crop)
+Spec = Tuple[str, int, bool]
+
+POST_VARIANTS: Dict[str, Spec] = {
+    # Feed cards; width-bounded, never upscaled
+    "image_feed_url": ("feed", settings.IMAGE_FEED_WIDTH, False),
+}
+
+AVATAR_VARIANTS: Dict[str, Spec] = {
+    # Lists, comments and post headers (40-48px at 2x)
+    "avatar_small_url": ("s", settings.IMAGE_AVATAR_SMALL, True),
+    # Profile headers
+    "avatar_medium_url": ("m", settings.IMAGE_AVATAR_MEDIUM, True),
+}
+
+_image_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix="image-variants",
+)
+# Only touched from the event loop, so no lock is needed
+_image_pending = 0
+# Strong references so scheduled jobs are not garbage-collected mid-flight
+_jobs: set = set()
+
+
+def _render(source: str, target: str, size: int, square: bool) -> None:
+    if os.path.exists(target):
+        # Same original already processed (content-addressed)
+        return
+    with Image.open(source) as im:
+        im = ImageOps.exif_transpose(im)
+        if square:
+            im = ImageOps.fit(im, (size, size), Image.LANCZOS)
+        elif im.width > size:
+            im = im.resize((size, max(1, round(im.height * size / im.width))), Image.LANCZOS)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info or "A" in im.getbands() else "RGB")
+        tmp = temp_upload_path()
+        # No exif= argument, so no metadata is carried over
+        im.save(tmp, "WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+    os.replace(tmp, target)
+
+
+def _render_all(filename: str, specs: Dict[str, Spec]) -> Dict[str, str]:
+    """Produce every variant of one original; returns property -> file name."""
+    source = os.path.join(UPLOADS_DIR, filename)
+    stem = os.path.splitext(filename)[0]
+    names = {}
+    for prop, (suffix, size, square) in specs.items():
+        name = f"{stem}_{suffix}.webp"
+        _render(source, os.path.join(UPLOADS_DIR, name), size, square)
+        names[prop] = name
+    return names
+
+
+async def _process(label: str, cypher: str, node_id: str, filename: str,
+                   source_url: str, specs: Dict[str, Spec]) -> None:
+    global _image_pending
+    _image_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        names = await loop.run_in_executor(_image_executor, _render_all, filename, specs)
+        # Variant URLs use the same form (absolute or /uploads/...) as the original
+        base = source_url.rsplit("/", 1)[0]
+        variants = {prop: f"{base}/{name}" for prop, name in names.items()}
+        return await async_db.write_single(cypher, id=node_id, source=source_url, variants=variants)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Image variants failed for {label} {node_id} ({filename}): {e}")
+    finally:
+        _image_pending -= 1
+
+
+def _schedule(coro) -> bool:
+    if Image is None or not settings.IMAGE_VARIANTS_ENABLED:
+        coro.close()
+        return False
+    if _image_pending >= settings.IMAGE_MAX_PENDING:
+        # The original keeps being served; nothing is lost but bandwidth
+        coro.close()
+        logger.warning("Image variant queue full, skipping job")
+        return False
+    task = asyncio.get_running_loop().create_task(coro)
+    _jobs.add(task)
+    task.add_done_callback(_jobs.discard)
+    return True
+
+
+async def _post_job(post_id: str, filename: str, source_url: str) -> None:
+    rec = await _process(
+        "post",
+        """
+        MATCH (p:Post {id: $id}) WHERE p.image_url = $source
+        SET p += $variants
+        RETURN p.id AS id
+        """,
+        post_id, filename, source_url, POST_VARIANTS,
+    )
+    if rec:
+        invalidate(post_tag(post_id))
+
+
+async def _avatar_job(user_id: str, filename: str, source_url: str) -> None:
+    rec = await _process(
+        "user",
+        """
+        MATCH (u:User {id: $id}) WHERE u.avatar_url = $source
+        SET u += $variants
+        RETURN u
+        """,
+        user_id, filename, source_url, AVATAR_VARIANTS,
+    )
+    if rec:
+        invalidate(user_tag(user_id))
+        invalidate_cached_user(user_id=user_id)
+        username_index.upsert(dict(rec["u"]))
+
+
+def schedule_post_variants(post_id: str, filename: str, source_url: str) -> bool:
+    """Queue variants for a post image stored as `filename`; call from the event loop."""
+    return _schedule(_post_job(post_id, filename, source_url))
+
+
+def schedule_avatar_variants(user_id: str, filename: str, source_url: str) -> bool:
+    """Queue avatar variants for a user; call from the event loop."""
+    return _schedule(_avatar_job(user_id, filename, source_url))
+
+
+def shutdown_image_executor() -> None:
+    for task in list(_jobs):
+        task.cancel()
+    _image_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,48 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+# List endpoints keep returning plain JSON arrays; the cursor for the next
+# page travels in this header (exposed through CORS in main.py).
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*parts: Any) -> str:
+    """Pack key values (e.g. created_at, id) into an opaque URL-safe token."""
+    raw = json.dumps(list(parts), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 2) -> List[Any]:
+    """Inverse of encode_cursor; a malformed cursor is a 400, not a 500."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(parts, list) or len(parts) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return parts
+
+
+def paginate(
+    rows: Sequence[Any],
+    limit: int,
+    cursor_of: Callable[[Any], Tuple[Any, ...]],
+) -> Tuple[List[Any], Optional[str]]:
+    """Split a `limit + 1` fetch into (page, next_cursor).
+
+    Queries fetch one extra row so we know whether another page exists
+    without a separate count.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    return page, encode_cursor(*cursor_of(page[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
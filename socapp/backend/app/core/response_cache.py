@@ -0,0 +1,143 @@
+"""Cache of rendered JSON responses for public read endpoints.
+
+Each entry is keyed by a resource tag plus the request path and query, so a
+write route can drop every cached view of a resource with `invalidate(tag)`.
+Every response carries a strong ETag; a matching If-None-Match gets a 304.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# body, etag, extra headers set by the route (e.g. X-Next-Cursor)
+Entry = Tuple[bytes, str, Dict[str, str]]
+
+_SKIPPED_HEADERS = {"content-length", "content-type"}
+
+
+def _key(tag: str, request: Request) -> str:
+    return f"{tag}|{request.url.path}?{request.url.query}"
+
+
+def _tag_of(key: str) -> str:
+    return key.partition("|")[0]
+
+
+class ResponseCacheBackend:
+    """Storage for rendered responses. Values are opaque Entry tuples."""
+
+    def get(self, key: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: Entry, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete_tag(self, tag: str) -> int:
+        """Drop every entry whose key starts with `tag|`; returns the count."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryResponseCache(ResponseCacheBackend):
+    """Per-worker LRU. Other workers only see an invalidation once their own
+    copy expires, so RESPONSE_CACHE_TTL_SECONDS bounds cross-worker staleness.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, tag_of=_tag_of)
+
+    def get(self, key: str) -> Optional[Entry]:
+        return self._cache.get(key)
+
+    def set(self, key: str, entry: Entry, ttl: float) -> None:
+        self._cache.set(key, entry, ttl=ttl)
+
+    def delete_tag(self, tag: str) -> int:
+        return self._cache.invalidate_tag(tag)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+_BACKENDS = {
+    "memory": InMemoryResponseCache,
+}
+
+_backend: Optional[ResponseCacheBackend] = None
+
+
+def get_response_cache() -> ResponseCacheBackend:
+    global _backend
+    if _backend is None:
+        cls = _BACKENDS.get(settings.RESPONSE_CACHE_BACKEND)
+        if cls is None:
+            raise RuntimeError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}")
+        _backend = cls(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+    return _backend
+
+
+def register_response_cache_backend(name: str, cls: type) -> None:
+    """Make another ResponseCacheBackend selectable through RESPONSE_CACHE_BACKEND."""
+    _BACKENDS[name] = cls
+
+
+def post_tag(post_id: str) -> str:
+    return f"post:{post_id}"
+
+
+def user_tag(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def invalidate(*tags: str) -> None:
+    """Drop every cached response recorded under any of `tags`."""
+    backend = get_response_cache()
+    for tag in tags:
+        backend.delete_tag(tag)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison (RFC 9110)
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return etag in candidates
+
+
+def cached_json(request: Request, tag: str, build: Callable[[Response], Any]) -> Response:
+    """Serve `build(response)` through the cache under `tag`.
+
+    `build` receives a scratch Response for headers (like a route's own
+    `response: Response` parameter); those headers are cached with the body.
+    Exceptions from `build` (e.g. 404) propagate and are not cached.
+    """
+    key = _key(tag, request)
+    backend = get_response_cache()
+    enabled = settings.RESPONSE_CACHE_TTL_SECONDS > 0
+    entry = backend.get(key) if enabled else None
+    if entry is None:
+        scratch = Response()
+        content = build(scratch)
+        body = json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        extra = {k: v for k, v in scratch.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        entry = (body, etag, extra)
+        if enabled:
+            backend.set(key, entry, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+    body, etag, extra = entry
+    # Clients may keep their copy but must revalidate it with the ETag first
+    headers = {**extra, "ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
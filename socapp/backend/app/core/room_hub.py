@@ -0,0 +1,179 @@
+"""Room-based fan-out for raw WebSocket connections.
+
+Publishing never awaits a client. Each connection owns a bounded outbound
+queue drained by its own writer task, so sends to different clients proceed
+concurrently and a slow client only delays itself. When a client's queue is
+full (or one send exceeds the send timeout) the slow-consumer policy applies:
+
+    "evict"        close the connection (code 1013, try again later)
+    "drop_oldest"  discard its oldest queued message and keep it connected
+
+Room membership lives in sets spread over `shards` dicts keyed by room name,
+so joins and leaves are O(1) and no single dict holds every room.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("evict", "drop_oldest")
+
+# Enqueue this many messages before yielding to the loop during a big fan-out
+_FANOUT_BATCH = 512
+
+
+class Connection:
+    """One client: its outbound queue, writer task and joined rooms.
+    `socket` needs async `send_text(str)` and `close(code=...)`, like
+    Starlette's WebSocket.
+    """
+
+    __slots__ = ("socket", "queue", "rooms", "writer", "closed", "dropped", "sending_since")
+
+    def __init__(self, socket, queue_size: int):
+        self.socket = socket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.rooms: Set[str] = set()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.dropped = 0
+        # loop.time() when the in-flight send began; None while idle
+        self.sending_since: Optional[float] = None
+
+
+class RoomHub:
+    def __init__(self, shards: int = 16, queue_size: int = 256,
+                 send_timeout: float = 5.0, policy: str = "evict"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown slow-consumer policy: {policy}")
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.policy = policy
+        self._shards: List[Dict[str, Set[Connection]]] = [{} for _ in range(max(1, shards))]
+        self.connections: Set[Connection] = set()
+        self.evicted = 0
+        self._watchdog: Optional[asyncio.Task] = None
+
+    def _shard(self, room: str) -> Dict[str, Set[Connection]]:
+        return self._shards[hash(room) % len(self._shards)]
+
+    # ---- membership ----
+    def connect(self, socket, rooms: Iterable[str] = ()) -> Connection:
+        """Register an already-accepted socket and start its writer."""
+        conn = Connection(socket, self.queue_size)
+        self.connections.add(conn)
+        for room in rooms:
+            self.join(conn, room)
+        loop = asyncio.get_running_loop()
+        conn.writer = loop.create_task(self._write(conn))
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = loop.create_task(self._watch())
+        return conn
+
+    def join(self, conn: Connection, room: str) -> None:
+        if conn.closed:
+            return
+        self._shard(room).setdefault(room, set()).add(conn)
+        conn.rooms.add(room)
+
+    def leave(self, conn: Connection, room: str) -> None:
+        shard = self._shard(room)
+        members = shard.get(room)
+        if members is not None:
+            members.discard(conn)
+            if not members:
+                del shard[room]
+        conn.rooms.discard(room)
+
+    def disconnect(self, conn: Connection) -> None:
+        """Forget a connection; O(rooms it joined). Safe to call twice."""
+        if conn.closed:
+            return
+        conn.closed = True
+        for room in list(conn.rooms):
+            self.leave(conn, room)
+        self.connections.discard(conn)
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    def members(self, room: str) -> int:
+        return len(self._shard(room).get(room, ()))
+
+    # ---- fan-out ----
+    async def publish(self, room: str, message: str, exclude: Optional[Connection] = None) -> int:
+        """Queue `message` for every member of `room`; returns how many got it.
+        Never waits on a client.
+        """
+        members = self._shard(room).get(room)
+        if not members:
+            return 0
+        delivered = 0
+        slow: List[Connection] = []
+        # Snapshot: members may join or leave while we yield below
+        for i, conn in enumerate(tuple(members), 1):
+            if conn is exclude or conn.closed:
+                continue
+            try:
+                conn.queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                if self.policy == "drop_oldest":
+                    conn.queue.get_nowait()
+                    conn.queue.put_nowait(message)
+                    conn.dropped += 1
+                    delivered += 1
+                else:
+                    slow.append(conn)
+            if i % _FANOUT_BATCH == 0:
+                await asyncio.sleep(0)
+        for conn in slow:
+            self._evict(conn, "outbound queue full")
+        return delivered
+
+    async def _write(self, conn: Connection) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                message = await conn.queue.get()
+                conn.sending_since = loop.time()
+                await conn.socket.send_text(message)
+                conn.sending_since = None
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Broken socket; the receive loop will see the disconnect too
+            self.disconnect(conn)
+
+    async def _watch(self) -> None:
+        # One sweep for all sends instead of a timer per send_text, which
+        # costs more than the send itself at 10k connections
+        loop = asyncio.get_running_loop()
+        while self.connections:
+            await asyncio.sleep(self.send_timeout / 2)
+            deadline = loop.time() - self.send_timeout
+            for conn in tuple(self.connections):
+                started = conn.sending_since
+                if started is not None and started < deadline:
+                    self._evict(conn, "send timed out")
+
+    def _evict(self, conn: Connection, reason: str) -> None:
+        if conn.closed:
+            return
+        self.evicted += 1
+        logger.info(f"Evicting slow WebSocket consumer: {reason}")
+        self.disconnect(conn)
+        asyncio.get_running_loop().create_task(self._close(conn))
+
+    async def _close(self, conn: Connection) -> None:
+        try:
+            await asyncio.wait_for(conn.socket.close(code=1013), self.send_timeout)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.connections),
+            "rooms": sum(len(shard) for shard in self._shards),
+            "evicted": self.evicted,
+        }
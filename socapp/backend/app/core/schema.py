@@ -0,0 +1,258 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import async_db
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One versioned schema step.
+
+    `statements` are independent, idempotent DDL run one per auto-commit
+    transaction; one failing doesn't stop the others. `backfill`, if set, is
+    a write that handles at most $batch rows and returns `count(*) AS
+    updated`; it is repeated until a batch comes back short, so no single
+    transaction touches the whole graph. `requires` lists versions that
+    must be applied first; everything else runs even if they failed.
+    """
+    version: int
+    name: str
+    statements: List[str] = field(default_factory=list)
+    backfill: Optional[str] = None
+    requires: List[int] = field(default_factory=list)
+
+
+# Append only. Never edit a migration that may already have been applied.
+MIGRATIONS = [
+    Migration(
+        1,
+        "feed, conversation and message indexes",
+        [
+            # Keyset pagination of the post feed (ORDER BY created_at DESC, id DESC)
+            "CREATE INDEX post_created_at IF NOT EXISTS FOR (p:Post) ON (p.created_at)",
+            # Conversation lookup and message history paging
+            "CREATE CONSTRAINT conversation_id_unique IF NOT EXISTS FOR (c:Conversation) REQUIRE c.id IS UNIQUE",
+            "CREATE INDEX message_timestamp IF NOT EXISTS FOR (m:Message) ON (m.timestamp)",
+            # Inbox ordering
+            "CREATE INDEX conversation_last_message_at IF NOT EXISTS FOR (c:Conversation) ON (c.last_message_at)",
+        ],
+    ),
+    Migration(
+        2,
+        "uniqueness constraints for hot lookup keys",
+        [
+            "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+            "CREATE CONSTRAINT user_email_unique IF NOT EXISTS FOR (u:User) REQUIRE u.email IS UNIQUE",
+            "CREATE CONSTRAINT user_username_unique IF NOT EXISTS FOR (u:User) REQUIRE u.username IS UNIQUE",
+            "CREATE CONSTRAINT post_id_unique IF NOT EXISTS FOR (p:Post) REQUIRE p.id IS UNIQUE",
+            "CREATE CONSTRAINT comment_id_unique IF NOT EXISTS FOR (c:Comment) REQUIRE c.id IS UNIQUE",
+            "CREATE CONSTRAINT message_id_unique IF NOT EXISTS FOR (m:Message) REQUIRE m.id IS UNIQUE",
+        ],
+    ),
+    Migration(
+        3,
+        "range indexes for secondary lookups",
+        [
+            "CREATE INDEX user_verification_token IF NOT EXISTS FOR (u:User) ON (u.verification_token)",
+            "CREATE INDEX message_created_at IF NOT EXISTS FOR (m:Message) ON (m.created_at)",
+        ],
+    ),
+    Migration(
+        4,
+        "backfill User.profile_pic",
+        backfill="""
+        MATCH (u:User)
+        WHERE u.profile_pic IS NULL
+        WITH u LIMIT $batch
+        SET u.profile_pic = ''
+        RETURN count(*) AS updated
+        """,
+    ),
+    Migration(
+        5,
+        "full-text index for user search",
+        [
+            "CREATE FULLTEXT INDEX user_search IF NOT EXISTS FOR (u:User) ON EACH [u.username, u.bio]",
+        ],
+    ),
+    Migration(
+        6,
+        "backfill User.followers_count / following_count",
+        backfill="""
+        MATCH (u:User)
+        WHERE u.followers_count IS NULL OR u.following_count IS NULL
+        WITH u LIMIT $batch
+        SET u.followers_count = size([(u)<-[:FOLLOWS]-(:User) | 1]),
+            u.following_count = size([(u)-[:FOLLOWS]->(:User) | 1])
+        RETURN count(*) AS updated
+        """,
+    ),
+    Migration(
+        7,
+        "comment ordering index",
+        [
+            "CREATE INDEX comment_created_at IF NOT EXISTS FOR (c:Comment) ON (c.created_at)",
+        ],
+    ),
+    Migration(
+        8,
+        "backfill Message.created_at from timestamp",
+        backfill="""
+        MATCH (m:Message)
+        WHERE m.created_at IS NULL AND m.timestamp IS NOT NULL
+        WITH m LIMIT $batch
+        SET m.created_at = m.timestamp
+        RETURN count(*) AS updated
+        """,
+    ),
+    Migration(
+        9,
+        "Message.conversation_id and (conversation_id, created_at) index",
+        [
+            # Message history pages seek this index instead of expanding
+            # every HAS_MESSAGE edge of the conversation
+            "CREATE INDEX message_conversation_created_at IF NOT EXISTS "
+            "FOR (m:Message) ON (m.conversation_id, m.created_at)",
+        ],
+        backfill="""
+        MATCH (c:Conversation)-[:HAS_MESSAGE]->(m:Message)
+        WHERE m.conversation_id IS NULL
+        WITH c, m LIMIT $batch
+        SET m.conversation_id = c.id
+        RETURN count(*) AS updated
+        """,
+    ),
+    Migration(
+        10,
+        "backfill Conversation.last_message_at / LAST_MESSAGE",
+        # The inbox only lists conversations with last_message_at set, so
+        # ones created before the pointer existed stay hidden until this runs
+        backfill="""
+        MATCH (c:Conversation)
+        WHERE c.last_message_at IS NULL AND (c)-[:HAS_MESSAGE]->()
+        WITH c LIMIT $batch
+        CALL {
+            WITH c
+            MATCH (c)-[:HAS_MESSAGE]->(m:Message)
+            RETURN m ORDER BY coalesce(m.timestamp, m.created_at) DESC LIMIT 1
+        }
+        SET c.last_message_at = coalesce(m.timestamp, m.created_at, c.created_at, '')
+        MERGE (c)-[:LAST_MESSAGE]->(m)
+        RETURN count(*) AS updated
+        """,
+    ),
+]
+
+_LEDGER_CONSTRAINT = (
+    "CREATE CONSTRAINT schema_migration_version_unique IF NOT EXISTS "
+    "FOR (m:SchemaMigration) REQUIRE m.version IS UNIQUE"
+)
+
+
+async def _applied_versions() -> set:
+    rows = await async_db.run_query("MATCH (m:SchemaMigration) RETURN m.version AS version")
+    return {r["version"] for r in rows}
+
+
+async def _run_backfill(cypher: str) -> int:
+    batch = settings.MIGRATION_BATCH_SIZE
+    total = 0
+    while True:
+        rec = await async_db.write_single(cypher, batch=batch)
+        updated = (rec and rec["updated"]) or 0
+        total += updated
+        if updated < batch:
+            return total
+
+
+# Outcome of run_migrations in this process, reported by /health
+_status: Dict[str, object] = {"finished": False, "error": None, "applied": [], "failed": {}}
+
+
+def migration_status() -> dict:
+    """Applied versions, failed versions with their errors, and whether the
+    run is over (`error` is set when the database couldn't be reached).
+    """
+    return {
+        "finished": _status["finished"],
+        "error": _status["error"],
+        "applied": list(_status["applied"]),
+        "failed": dict(_status["failed"]),
+    }
+
+
+def migrations_applied(*versions: int) -> bool:
+    """True once every given version is recorded as applied (in this process's
+    view), so callers can keep a slower query until a backfill has finished.
+    """
+    applied = _status["applied"]
+    return all(v in applied for v in versions)
+
+
+async def apply_migration(migration: Migration) -> None:
+    """Run every statement, then the backfill, then record the version.
+    Raises if any statement failed, after trying all of them.
+    """
+    errors = []
+    for statement in migration.statements:
+        try:
+            await async_db.run_query(statement)
+        except Exception as e:
+            errors.append(f"{statement.split(' IF NOT EXISTS')[0]}: {e}")
+    if errors:
+        raise RuntimeError("; ".join(errors))
+    if migration.backfill:
+        updated = await _run_backfill(migration.backfill)
+        logger.info(f"Migration {migration.version} backfilled {updated} nodes")
+    await async_db.write_single(
+        """
+        MERGE (m:SchemaMigration {version: $version})
+        SET m.name = $name, m.applied_at = $now
+        RETURN m.version AS version
+        """,
+        version=migration.version,
+        name=migration.name,
+        now=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+async def run_migrations() -> None:
+    """Apply pending migrations in version order; started from the app lifespan.
+
+    A failed version is recorded (see migration_status) and retried on the
+    next start; later versions still run unless they `require` it. All DDL
+    uses IF NOT EXISTS, so workers racing here is harmless.
+    """
+    failed: Dict[int, str] = {}
+    _status.update(finished=False, error=None, applied=[], failed=failed)
+    try:
+        await async_db.run_query(_LEDGER_CONSTRAINT)
+        applied = await _applied_versions()
+    except Exception as e:
+        logger.warning(f"Schema migrations skipped, database unavailable: {e}")
+        _status["error"] = f"database unavailable: {e}"
+        return
+    _status["applied"] = sorted(applied)
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        missing = [v for v in migration.requires if v not in applied]
+        if missing:
+            failed[migration.version] = f"requires unapplied migration(s) {missing}"
+            logger.error(f"Migration {migration.version} ({migration.name}) skipped: {failed[migration.version]}")
+            continue
+        try:
+            await apply_migration(migration)
+            applied.add(migration.version)
+            _status["applied"] = sorted(applied)
+            logger.info(f"Applied migration {migration.version}: {migration.name}")
+        except Exception as e:
+            failed[migration.version] = str(e)
+            logger.error(f"Migration {migration.version} ({migration.name}) failed: {e}")
+    _status["finished"] = True
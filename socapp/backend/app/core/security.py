@@ -1,8 +1,11 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import db
 
@@ -37,24 +40,85 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+# Dedicated pool for Argon2/bcrypt work. Both release the GIL, so threads give
+# real parallelism without tying up the default AnyIO pool other routes use.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# Only touched from the event loop, so no lock is needed
+_hash_pending = 0
+
+async def _run_hasher(fn, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    """
+    Awaitable get_password_hash, run on the hashing pool.
+    Raises 503 when too many hashes are already queued.
+    """
+    return await _run_hasher(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify on the hashing pool. Returns (valid, new_hash) where new_hash is
+    set when the stored hash uses a deprecated scheme (bcrypt) and should be
+    replaced with an Argon2 one.
+    """
+    return await _run_hasher(pwd_context.verify_and_update, plain_password, hashed_password)
+
+def shutdown_hash_executor() -> None:
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+# Resolved users keyed by token subject (email or username), password stripped
+user_cache = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+def invalidate_cached_user(*subjects: str, user_id: str | None = None) -> None:
     """
-    Retrieve the current user from a JWT token.
+    Drop cached users by token subject and/or by user id.
+    Call this from any route that changes a user's stored profile.
+    """
+    if subjects:
+        user_cache.invalidate(*subjects)
+    if user_id:
+        user_cache.invalidate_where(lambda _sub, u: u.get("id") == user_id)
+
+def decode_access_token(token: str) -> str | None:
+    """
+    Subject (email or username) of a valid, unexpired access token, else None.
+    Shared by HTTP auth and the Socket.IO connect handler.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
         payload = jwt.decode(token, settings.jwt_secret_value, algorithms=[settings.JWT_ALGORITHM])
-        subject = payload.get("sub")
-        if subject is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        return None
+    return payload.get("sub")
+
+def get_user_by_subject(subject: str) -> dict | None:
+    """
+    Resolve a token subject to its user (password stripped), via `user_cache`.
+    Callers get their own copy.
+    """
+    cached = user_cache.get(subject)
+    if cached is not None:
+        return dict(cached)
 
     with db.get_session() as session:
         # Try email first
@@ -63,8 +127,28 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
             # Fallback to username
             record = session.run("MATCH (u:User {username: $sub}) RETURN u", sub=subject).single()
         if not record:
-            raise credentials_exception
+            return None
 
         user = dict(record["u"])
         user.pop("password", None)  # Remove password for safety
-        return user
+
+    user_cache.set(subject, user)
+    return dict(user)
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Retrieve the current user from a JWT token.
+    Served from `user_cache` when possible; callers get their own copy.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    subject = decode_access_token(token)
+    if subject is None:
+        raise credentials_exception
+    user = get_user_by_subject(subject)
+    if user is None:
+        raise credentials_exception
+    return user
@@ -0,0 +1,117 @@
+"""Socket.IO client managers, chosen by SOCKETIO_MESSAGE_QUEUE.
+
+Without a queue URL the server uses python-socketio's in-memory manager, so
+emits only reach clients of the same worker. With one, every worker shares a
+pub/sub channel and `sio.emit(..., room=...)` reaches the room on all of them:
+
+    redis://host:6379/0   AsyncRedisManager (needs the `redis` package)
+    amqp://user@host//    AsyncAioPikaManager (needs `aio_pika`)
+    local://              LocalPubSubManager on an in-process LocalBroker
+
+`local://` is a stand-in broker for tests and development: several
+AsyncServer instances in one process (e.g. one per simulated worker) behave as
+if they were connected through a real queue, including JSON round-tripping
+of every message.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Set
+from urllib.parse import urlparse
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """In-process pub/sub: every subscriber of a channel gets every message."""
+
+    def __init__(self, max_queue: int = 10000):
+        self.max_queue = max_queue
+        self._channels: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._channels.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        self._channels.get(channel, set()).discard(queue)
+
+    async def publish(self, channel: str, message: str) -> int:
+        delivered = 0
+        for queue in list(self._channels.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                # Like a real broker dropping a lagging subscriber's backlog
+                logger.warning(f"LocalBroker subscriber on {channel!r} is full, message dropped")
+        return delivered
+
+
+default_broker = LocalBroker()
+
+
+class LocalPubSubManager(AsyncPubSubManager):
+    """AsyncPubSubManager over a LocalBroker (the shared default unless given)."""
+
+    name = "localpubsub"
+
+    def __init__(self, broker: Optional[LocalBroker] = None, channel: str = "socketio",
+                 write_only: bool = False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.broker = broker or default_broker
+
+    async def _publish(self, data):
+        # Serialize exactly as the Redis manager does
+        await self.broker.publish(self.channel, self.json.dumps(data))
+
+    async def _listen(self):
+        queue = self.broker.subscribe(self.channel)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.broker.unsubscribe(self.channel, queue)
+
+
+def _redis_manager(url: str, channel: str):
+    return socketio.AsyncRedisManager(url, channel=channel)
+
+
+def _amqp_manager(url: str, channel: str):
+    return socketio.AsyncAioPikaManager(url, channel=channel)
+
+
+def _local_manager(url: str, channel: str):
+    return LocalPubSubManager(channel=channel)
+
+
+_MANAGERS: Dict[str, Callable[[str, str], socketio.AsyncManager]] = {
+    "redis": _redis_manager,
+    "rediss": _redis_manager,
+    "amqp": _amqp_manager,
+    "amqps": _amqp_manager,
+    "local": _local_manager,
+}
+
+
+def create_client_manager() -> Optional[socketio.AsyncManager]:
+    """Manager for the AsyncServer, or None for the in-memory default."""
+    url = settings.SOCKETIO_MESSAGE_QUEUE
+    if not url:
+        return None
+    scheme = urlparse(url).scheme
+    factory = _MANAGERS.get(scheme)
+    if factory is None:
+        raise RuntimeError(f"Unsupported SOCKETIO_MESSAGE_QUEUE scheme: {scheme!r}")
+    return factory(url, settings.SOCKETIO_CHANNEL)
+
+
+def register_client_manager(scheme: str, factory: Callable[[str, str], socketio.AsyncManager]) -> None:
+    """Make another manager selectable by SOCKETIO_MESSAGE_QUEUE URL scheme."""
+    _MANAGERS[scheme] = factory
@@ -0,0 +1,83 @@
+"""Serving of /uploads.
+
+Upload names never get reused for different bytes (content-addressed blobs
+and their variants, and legacy uuid names), so every file is served as
+immutable with a strong ETag. Range requests (including If-Range) are handled
+by FileResponse, which hands the path to the server for zero-copy sending when
+it supports the ASGI `http.response.pathsend` extension and streams from a
+worker thread otherwise.
+"""
+import os
+from mimetypes import guess_type
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+
+# Checked in preference order; a sibling `<name>.br` / `<name>.gz` is used
+# when present and accepted by the client
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepts(request_headers: Headers, coding: str) -> bool:
+    for part in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class UploadFiles(StaticFiles):
+    """StaticFiles with long-lived caching headers for upload blobs."""
+
+    def _precompressed(self, full_path: str, request_headers: Headers) -> Optional[Response]:
+        for coding, suffix in _PRECOMPRESSED:
+            if not _accepts(request_headers, coding):
+                continue
+            try:
+                stat_result = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            response = FileResponse(
+                full_path + suffix,
+                stat_result=stat_result,
+                # Type of the original, not of the .br/.gz file
+                media_type=guess_type(full_path)[0] or "application/octet-stream",
+            )
+            response.headers["content-encoding"] = coding
+            response.headers["etag"] = f'"{os.path.basename(full_path)}-{coding}"'
+            return response
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+
+        response = None
+        # Byte ranges always address the identity encoding
+        if "range" not in request_headers:
+            response = self._precompressed(full_path, request_headers)
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+            # The name already identifies the bytes; it makes a stable strong ETag
+            response.headers["etag"] = f'"{os.path.basename(full_path)}"'
+
+        response.headers["cache-control"] = (
+            f"public, max-age={settings.UPLOADS_CACHE_MAX_AGE_SECONDS}, immutable"
+        )
+        response.headers["vary"] = "Accept-Encoding"
+        response.headers["x-content-type-options"] = "nosniff"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,107 @@
+import bisect
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# A timeline entry is (created_at, post_id); both sort lexicographically, so
+# the tuple order matches the feed order (newest last in storage).
+Entry = Tuple[str, str]
+
+
+class TimelineBackend:
+    """Storage for per-user home timelines (fan-out-on-write targets).
+
+    A user with no stored timeline is "cold"; the feed route rebuilds it from
+    the graph on first read. Implementations must bound each timeline to
+    `max_length` entries, dropping the oldest.
+    """
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+
+    def is_warm(self, user_id: str) -> bool:
+        raise NotImplementedError
+
+    def replace(self, user_id: str, entries: Iterable[Entry]) -> None:
+        raise NotImplementedError
+
+    def push(self, user_ids: Iterable[str], entry: Entry) -> int:
+        """Add entry to every *warm* timeline in user_ids; returns how many."""
+        raise NotImplementedError
+
+    def page(self, user_id: str, before: Optional[Entry], limit: int) -> List[Entry]:
+        """Newest-first entries strictly older than `before`."""
+        raise NotImplementedError
+
+    def drop(self, user_id: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryTimelineBackend(TimelineBackend):
+    """Process-local stand-in. Pushes only reach timelines held by the worker
+    that created the post, so each timeline expires `ttl` seconds after it
+    was built and is rebuilt from the graph; that bounds how stale another
+    worker's copy gets. At most `max_users` timelines are kept (LRU).
+    """
+
+    def __init__(self, max_length: int, max_users: Optional[int] = None, ttl: Optional[float] = None):
+        super().__init__(max_length)
+        self._timelines = TTLCache(
+            maxsize=settings.TIMELINE_MEMORY_MAX_USERS if max_users is None else max_users,
+            ttl=settings.TIMELINE_MEMORY_TTL_SECONDS if ttl is None else ttl,
+        )
+        self._lock = threading.Lock()
+
+    def is_warm(self, user_id: str) -> bool:
+        return self._timelines.get(user_id) is not None
+
+    def replace(self, user_id: str, entries: Iterable[Entry]) -> None:
+        ordered = sorted(set(entries))[-self.max_length:]
+        self._timelines.set(user_id, ordered)
+
+    def push(self, user_ids: Iterable[str], entry: Entry) -> int:
+        pushed = 0
+        with self._lock:
+            for uid in user_ids:
+                # Mutated in place, so a push doesn't extend the timeline's TTL
+                timeline = self._timelines.get(uid)
+                if timeline is None:
+                    continue
+                bisect.insort(timeline, entry)
+                if len(timeline) > self.max_length:
+                    del timeline[: len(timeline) - self.max_length]
+                pushed += 1
+        return pushed
+
+    def page(self, user_id: str, before: Optional[Entry], limit: int) -> List[Entry]:
+        with self._lock:
+            timeline = self._timelines.get(user_id) or []
+            end = bisect.bisect_left(timeline, before) if before else len(timeline)
+            return timeline[max(0, end - limit):end][::-1]
+
+    def drop(self, user_id: str) -> None:
+        self._timelines.invalidate(user_id)
+
+
+_BACKENDS = {
+    "memory": InMemoryTimelineBackend,
+}
+
+_backend: Optional[TimelineBackend] = None
+
+
+def get_timeline_backend() -> TimelineBackend:
+    global _backend
+    if _backend is None:
+        cls = _BACKENDS.get(settings.TIMELINE_BACKEND)
+        if cls is None:
+            raise RuntimeError(f"Unknown TIMELINE_BACKEND: {settings.TIMELINE_BACKEND}")
+        _backend = cls(settings.TIMELINE_MAX_LENGTH)
+    return _backend
+
+
+def register_timeline_backend(name: str, cls: type) -> None:
+    """Make another TimelineBackend selectable through TIMELINE_BACKEND."""
+    _BACKENDS[name] = cls
@@ -0,0 +1,172 @@
+import asyncio
+import bisect
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import async_db
+
+logger = logging.getLogger(__name__)
+
+# Public user fields kept in memory so hits can be answered without the graph
+PUBLIC_FIELDS = ("id", "username", "name", "bio", "avatar_url", "avatar_small_url")
+
+
+def _entry(user: dict) -> Optional[dict]:
+    if not user.get("id") or not user.get("username"):
+        return None
+    return {k: user.get(k) for k in PUBLIC_FIELDS}
+
+
+class UsernameIndex:
+    """In-process username prefix index.
+
+    Lookups bisect a sorted list of lower-cased usernames, so hits are the
+    same users the Cypher `username:term*` prefix search returns. The index
+    is "cold" until the first full build completes, and callers should fall
+    back to the full-text Cypher search until then.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users: Dict[str, dict] = {}
+        self._sorted: List[Tuple[str, str]] = []
+        # Writes seen since begin_build(), replayed over the new snapshot;
+        # None while no build is running
+        self._journal: Optional[List[Tuple[str, Optional[dict]]]] = None
+        self.ready = False
+
+    # ---- writes ----
+    def begin_build(self) -> None:
+        """Start recording upserts/removes; call before reading the snapshot."""
+        with self._lock:
+            self._journal = []
+
+    def abort_build(self) -> None:
+        with self._lock:
+            self._journal = None
+
+    def build(self, users: Iterable[dict]) -> None:
+        """Swap in a snapshot, then replay writes made since begin_build()
+        so edits that raced the snapshot read aren't lost.
+        """
+        entries = {}
+        for user in users:
+            entry = _entry(user)
+            if entry is not None:
+                entries[entry["id"]] = entry
+        with self._lock:
+            for user_id, entry in self._journal or ():
+                entries.pop(user_id, None)
+                if entry is not None:
+                    entries[user_id] = entry
+            self._journal = None
+            self._users = entries
+            # One sort instead of an insort per user
+            self._sorted = sorted((e["username"].lower(), uid) for uid, e in entries.items())
+            self.ready = True
+
+    def upsert(self, user: dict) -> None:
+        if not user.get("id"):
+            return
+        entry = _entry(user)
+        with self._lock:
+            self._remove(user["id"])
+            if entry is not None:
+                self._users[entry["id"]] = entry
+                bisect.insort(self._sorted, (entry["username"].lower(), entry["id"]))
+            if self._journal is not None:
+                self._journal.append((user["id"], entry))
+
+    def remove(self, user_id: str) -> None:
+        with self._lock:
+            self._remove(user_id)
+            if self._journal is not None:
+                self._journal.append((user_id, None))
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return
+        key = entry["username"].lower()
+        i = bisect.bisect_left(self._sorted, (key, user_id))
+        if i < len(self._sorted) and self._sorted[i] == (key, user_id):
+            del self._sorted[i]
+
+    # ---- reads ----
+    def search(self, query: str, limit: int) -> List[dict]:
+        """Exact match first, then prefix matches, shorter usernames first.
+        Each hit carries a `score`.
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+        with self._lock:
+            hits: List[Tuple[int, int, str, str]] = []
+            i = bisect.bisect_left(self._sorted, (q, ""))
+            while i < len(self._sorted) and self._sorted[i][0].startswith(q):
+                key, uid = self._sorted[i]
+                hits.append((0 if key == q else 1, len(key), key, uid))
+                i += 1
+            hits.sort()
+            return [
+                {**self._users[uid], "score": float(2 - tier)}
+                for tier, _, _, uid in hits[:limit]
+            ]
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+username_index = UsernameIndex()
+
+
+async def build_username_index() -> int:
+    """Load every User's public fields in id-ordered batches and swap them in."""
+    users: List[dict] = []
+    after = ""
+    username_index.begin_build()
+    try:
+        while True:
+            rows = await async_db.run_query(
+                """
+                MATCH (u:User)
+                WHERE u.id > $after
+                RETURN u.id AS id, u.username AS username, u.name AS name,
+                       u.bio AS bio, u.avatar_url AS avatar_url,
+                       u.avatar_small_url AS avatar_small_url
+                ORDER BY u.id
+                LIMIT $batch
+                """,
+                after=after,
+                batch=settings.MIGRATION_BATCH_SIZE,
+            )
+            users.extend(dict(r) for r in rows)
+            if len(rows) < settings.MIGRATION_BATCH_SIZE:
+                break
+            after = rows[-1]["id"]
+    except BaseException:
+        username_index.abort_build()
+        raise
+    username_index.build(users)
+    return len(users)
+
+
+async def run_username_index_refresher() -> None:
+    """Build at startup, then rebuild periodically so edits made on other
+    workers show up. Started from the app lifespan; never raises.
+    """
+    if not settings.TYPEAHEAD_INDEX_ENABLED:
+        return
+    while True:
+        try:
+            count = await build_username_index()
+            logger.info(f"Username typeahead index built with {count} users")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Username typeahead index build failed: {e}")
+        if settings.TYPEAHEAD_REBUILD_INTERVAL_SECONDS <= 0:
+            return
+        await asyncio.sleep(settings.TYPEAHEAD_REBUILD_INTERVAL_SECONDS)
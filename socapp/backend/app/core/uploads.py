@@ -0,0 +1,181 @@
+"""Content-addressed storage of user uploads under UPLOADS_DIR.
+
+Uploads are hashed while they stream to disk and stored once as
+`<sha256><ext>`, so repeated images share a file. Blobs are not deleted with
+their post or user; a background GC removes those no node references.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import Counter
+from uuid import uuid4
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.database import async_db
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = os.path.join(os.getcwd(), "uploads")
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+
+_TMP_PREFIX = ".upload-"
+# `<sha256><ext>` originals and `<sha256>_<variant>.<ext>` derivatives, plus
+# any precompressed `.br` / `.gz` siblings of either
+_BLOB_NAME = re.compile(r"^([0-9a-f]{64})(_[a-z0-9]+)?(\.[A-Za-z0-9]+)?(\.br|\.gz)?$")
+
+# Room for multipart boundaries and the non-file form fields
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _too_large() -> HTTPException:
+    limit_mb = settings.UPLOAD_MAX_BYTES / (1024 * 1024)
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {limit_mb:g} MB limit")
+
+
+async def enforce_upload_limit(request: Request, call_next):
+    """HTTP middleware: refuse multipart bodies whose declared Content-Length
+    is already over the limit, before anything is parsed or spooled.
+    Chunked bodies carry no length and are caught by save_upload instead.
+    """
+    if request.headers.get("content-type", "").lower().startswith("multipart/"):
+        try:
+            declared = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            declared = 0
+        if declared > settings.UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD:
+            exc = _too_large()
+            return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return await call_next(request)
+
+
+def temp_upload_path() -> str:
+    """A scratch path inside UPLOADS_DIR; the GC sweeps any left behind."""
+    return os.path.join(UPLOADS_DIR, f"{_TMP_PREFIX}{uuid4()}")
+
+
+def _commit_blob(tmp_path: str, filename: str) -> None:
+    """Move a finished temp file to its digest name, or drop it if that
+    content is already stored. A dedup hit refreshes the blob's mtime so the
+    GC grace period covers the new reference too.
+    """
+    path = os.path.join(UPLOADS_DIR, filename)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+        os.utime(path)
+    else:
+        os.replace(tmp_path, path)
+
+
+async def save_upload(upload: UploadFile, default_ext: str = ".jpg") -> str:
+    """Stream `upload` into the store and return its content-addressed name
+    (`<sha256><ext>`); identical uploads share one file.
+
+    Chunks of UPLOAD_CHUNK_SIZE are hashed and written from a worker thread so
+    the event loop never blocks on disk. Going past UPLOAD_MAX_BYTES removes
+    the partial file and raises 413.
+    """
+    if upload.size is not None and upload.size > settings.UPLOAD_MAX_BYTES:
+        raise _too_large()
+
+    ext = (os.path.splitext(upload.filename or "")[1] or default_ext).lower()
+    tmp_path = temp_upload_path()
+    digest = hashlib.sha256()
+
+    written = 0
+    f = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        while chunk := await upload.read(settings.UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > settings.UPLOAD_MAX_BYTES:
+                raise _too_large()
+            digest.update(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.remove, tmp_path)
+        raise
+    await asyncio.to_thread(f.close)
+
+    filename = f"{digest.hexdigest()}{ext}"
+    await asyncio.to_thread(_commit_blob, tmp_path, filename)
+    return filename
+
+
+async def upload_reference_counts() -> Counter:
+    """How many Post.image_url / User.avatar_url values point at each blob
+    digest; derivatives share their original's count.
+    """
+    rows = await async_db.run_query(
+        """
+        MATCH (p:Post) WHERE p.image_url CONTAINS '/uploads/'
+        RETURN p.image_url AS url
+        UNION ALL
+        MATCH (u:User) WHERE u.avatar_url CONTAINS '/uploads/'
+        RETURN u.avatar_url AS url
+        """
+    )
+    return Counter(r["url"].rsplit("/uploads/", 1)[1][:64] for r in rows)
+
+
+def _unreferenced_blobs(refs: Counter, grace: float) -> list:
+    cutoff = time.time() - grace
+    doomed = []
+    for entry in os.scandir(UPLOADS_DIR):
+        # Only content-addressed blobs (and abandoned temp files) are managed;
+        # legacy uuid-named uploads are left alone
+        name = entry.name
+        blob = _BLOB_NAME.match(name)
+        if blob:
+            unreferenced = refs[blob.group(1)] == 0
+        else:
+            unreferenced = name.startswith(_TMP_PREFIX)
+        if unreferenced and entry.is_file() and entry.stat().st_mtime < cutoff:
+            doomed.append(entry.path)
+    return doomed
+
+
+def _remove_if_stale(paths: list, grace: float) -> int:
+    cutoff = time.time() - grace
+    removed = 0
+    for path in paths:
+        try:
+            # Re-check: a dedup hit may have refreshed it since the scan
+            if os.stat(path).st_mtime < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+async def collect_unreferenced_uploads() -> int:
+    """Delete blobs no node references and that are older than the grace
+    period (which protects uploads whose node write is still in flight).
+    """
+    grace = settings.UPLOAD_GC_GRACE_SECONDS
+    refs = await upload_reference_counts()
+    doomed = await asyncio.to_thread(_unreferenced_blobs, refs, grace)
+    if not doomed:
+        return 0
+    return await asyncio.to_thread(_remove_if_stale, doomed, grace)
+
+
+async def run_upload_gc() -> None:
+    """Background loop started from the app lifespan; never raises."""
+    interval = settings.UPLOAD_GC_INTERVAL_SECONDS
+    while interval > 0:
+        await asyncio.sleep(interval)
+        try:
+            removed = await collect_unreferenced_uploads()
+            if removed:
+                logger.info(f"Upload GC removed {removed} unreferenced blobs")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Upload GC failed: {e}")
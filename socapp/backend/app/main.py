@@ -1,17 +1,51 @@
+import asyncio
 import sys
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.routes import auth, users, posts, chat, comments
 from app.routes import messages
 from app.sockets import socket_app
 from app.core.config import settings
+from app.core.counters import run_counter_reconciler
+from app.core.database import close_drivers
+from app.core.images import shutdown_image_executor
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.schema import migration_status, run_migrations
+from app.core.security import shutdown_hash_executor
+from app.core.typeahead import run_username_index_refresher
+from app.core.static_files import UploadFiles
+from app.core.uploads import UPLOADS_DIR, enforce_upload_limit, run_upload_gc
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-app = FastAPI(title="College Social Media Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migrations (DDL plus batched backfills) run beside request handling
+    background = [
+        asyncio.create_task(run_migrations()),
+        asyncio.create_task(run_counter_reconciler()),
+        asyncio.create_task(run_username_index_refresher()),
+        asyncio.create_task(run_upload_gc()),
+    ]
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    # Release the shared Neo4j connection pools on shutdown
+    await close_drivers()
+    shutdown_hash_executor()
+    shutdown_image_executor()
+
+
+app = FastAPI(title="College Social Media Backend", lifespan=lifespan)
+
+# Oversized uploads get a 413 before the body is read; registered before
+# CORS so the CORS middleware still wraps (and decorates) that response
+app.middleware("http")(enforce_upload_limit)
 
 # ✅ Add CORS FIRST
 origins = [
@@ -31,10 +65,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # ✅ Mount static files AFTER CORS
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", UploadFiles(directory=UPLOADS_DIR), name="uploads")
 
 # ✅ Include routers
 app.include_router(auth.router)
@@ -53,7 +88,9 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    # Failed migrations leave the app serving but some features degraded
+    migrations = migration_status()
+    return {"status": "degraded" if migrations["failed"] or migrations["error"] else "ok", "migrations": migrations}
 
 if __name__ == "__main__":
     import uvicorn
@@ -2,9 +2,17 @@ from fastapi import APIRouter, HTTPException, Depends, status, Form, BackgroundT
 from fastapi.responses import HTMLResponse 
 from pydantic import BaseModel, EmailStr
 from uuid import uuid4
-from app.core.database import db
-from app.core.security import get_password_hash, verify_password, create_access_token, get_current_user
+from app.core.database import db, async_db
+from app.core.security import (
+    hash_password_async,
+    verify_password_async,
+    create_access_token,
+    get_current_user,
+    invalidate_cached_user,
+)
 from fastapi.security import OAuth2PasswordBearer
+from neo4j.exceptions import ConstraintError
+from app.core.typeahead import username_index
 from app.core.email_verification import send_verification_email, generate_verification_token
 import datetime
 import logging
@@ -33,40 +41,49 @@ async def send_verification_email_with_delay(email: str, verification_token: str
     
 @router.post("/register")
 async def register(user: UserCreate, background_tasks: BackgroundTasks):
-    with db.get_session() as session:
-        existing = session.run(
-            "MATCH (u:User) WHERE u.email=$email OR u.username=$username RETURN u",
-            email=user.email,
-            username=user.username
-        ).single()
-
-        if existing:
+    # Refuse duplicates before hashing, so they never take an Argon2 slot
+    existing = await async_db.run_single(
+        "MATCH (u:User) WHERE u.email=$email OR u.username=$username RETURN u.id AS id LIMIT 1",
+        email=user.email,
+        username=user.username
+    )
+    if existing:
+        raise HTTPException(status_code=400, detail="Email or username already registered")
+
+    # Hash before opening a session so no pooled connection waits on Argon2
+    hashed_pw = await hash_password_async(user.password)
+
+    user_id = str(uuid4())
+    verification_token = generate_verification_token()
+    async with async_db.get_session() as session:
+        try:
+            result = await session.run(
+                """
+                CREATE (u:User {
+                    id: $id, 
+                    username: $username, 
+                    email: $email, 
+                    password: $password,
+                    email_verified: $email_verified,
+                    verification_token: $verification_token,
+                    created_at: $created_at,
+                    followers_count: 0,
+                    following_count: 0
+                })
+                """,
+                id=user_id, 
+                username=user.username, 
+                email=user.email, 
+                password=hashed_pw,
+                email_verified=False,
+                verification_token=verification_token,
+                created_at=datetime.datetime.utcnow().isoformat()
+            )
+            await result.consume()
+        except ConstraintError:
+            # Lost a race with a concurrent registration of the same name/email
             raise HTTPException(status_code=400, detail="Email or username already registered")
-
-        user_id = str(uuid4())
-        hashed_pw = get_password_hash(user.password)
-        verification_token = generate_verification_token()
-        
-        session.run(
-            """
-            CREATE (u:User {
-                id: $id, 
-                username: $username, 
-                email: $email, 
-                password: $password,
-                email_verified: $email_verified,
-                verification_token: $verification_token,
-                created_at: $created_at
-            })
-            """,
-            id=user_id, 
-            username=user.username, 
-            email=user.email, 
-            password=hashed_pw,
-            email_verified=False,
-            verification_token=verification_token,
-            created_at=datetime.datetime.utcnow().isoformat()
-        )
+    username_index.upsert({"id": user_id, "username": user.username})
 
     background_tasks.add_task(send_verification_email_with_delay, user.email, verification_token)
 
@@ -112,6 +129,7 @@ def verify_email(token: str):
             token=token,
             verified_at=datetime.datetime.utcnow().isoformat()
         )
+        invalidate_cached_user(user_id=user_data.get("id"))
 
     html_content = """
     <!DOCTYPE html>
@@ -152,78 +170,73 @@ def verify_email(token: str):
     
 @router.post("/resend-verification")
 async def resend_verification(email: str, background_tasks: BackgroundTasks):
-    with db.get_session() as session:
-        result = session.run(
+    async with async_db.get_session() as session:
+        result = await session.run(
             "MATCH (u:User {email: $email}) RETURN u",
             email=email
-        ).single()
+        )
+        record = await result.single()
 
-        if not result:
+        if not record:
             raise HTTPException(status_code=404, detail="User not found")
 
-        user_data = result["u"]
+        user_data = record["u"]
         
         if user_data.get("email_verified", False):
             raise HTTPException(status_code=400, detail="Email is already verified")
 
         new_token = generate_verification_token()
         
-        session.run(
+        await session.run(
             "MATCH (u:User {email: $email}) SET u.verification_token = $token",
             email=email,
             token=new_token
         )
+        invalidate_cached_user(email, user_id=user_data.get("id"))
 
     background_tasks.add_task(send_verification_email, email, new_token)
 
     return {"message": "Verification email sent successfully!"}
 
-@router.post("/login")
-def login_form(username: str = Form(...), password: str = Form(...)):
-    with db.get_session() as session:
-        record = session.run(
-            "MATCH (u:User {username: $username}) RETURN u",
-            username=username
-        ).single()
+async def _login(username: str, password: str) -> dict:
+    record = await async_db.run_single(
+        "MATCH (u:User {username: $username}) RETURN u",
+        username=username
+    )
+    if not record:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+
+    user_data = record["u"]
+    valid, new_hash = await verify_password_async(password, user_data["password"])
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+
+    if new_hash:
+        # Transparently upgrade legacy bcrypt hashes to Argon2
+        await async_db.run_query(
+            "MATCH (u:User {id: $id}) SET u.password = $password",
+            id=user_data.get("id"),
+            password=new_hash,
+        )
 
-        if not record or not verify_password(password, record["u"]["password"]):
-            raise HTTPException(status_code=400, detail="Invalid username or password")
+    if not user_data.get("email_verified", False):
+        raise HTTPException(
+            status_code=403, 
+            detail="Please verify your email before logging in"
+        )
 
-        user_data = record["u"]
-        
-        if not user_data.get("email_verified", False):
-            raise HTTPException(
-                status_code=403, 
-                detail="Please verify your email before logging in"
-            )
+    # A fresh login re-reads the profile on the next authenticated request
+    invalidate_cached_user(username, user_id=user_data.get("id"))
+    token = create_access_token({"sub": username})
+    return {"access_token": token, "token_type": "bearer"}
 
-        token = create_access_token({"sub": username})
-        return {"access_token": token, "token_type": "bearer"}
+@router.post("/login")
+async def login_form(username: str = Form(...), password: str = Form(...)):
+    return await _login(username, password)
 
 @router.post("/login-with-username")
-def login_json(payload: LoginRequest):
-    username = payload.username
-    password = payload.password
-
-    with db.get_session() as session:
-        record = session.run(
-            "MATCH (u:User {username: $username}) RETURN u",
-            username=username
-        ).single()
-
-        if not record or not verify_password(password, record["u"]["password"]):
-            raise HTTPException(status_code=400, detail="Invalid username or password")
-
-        user_data = record["u"]
-        
-        if not user_data.get("email_verified", False):
-            raise HTTPException(
-                status_code=403, 
-                detail="Please verify your email before logging in"
-            )
-
-        token = create_access_token({"sub": username})
-        return {"access_token": token, "token_type": "bearer"}
+async def login_json(payload: LoginRequest):
+    return await _login(payload.username, payload.password)
 
 @router.get("/users/me")
 def current_user(current_user: dict = Depends(get_current_user)):
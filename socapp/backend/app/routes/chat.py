@@ -1,37 +1,29 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from app.core.config import settings
+from app.core.room_hub import RoomHub
 
 router = APIRouter(prefix="/ws", tags=["Chat"])
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: str):
-        for connection in list(self.active_connections):
-            try:
-                await connection.send_text(message)
-            except Exception:
-                # Best-effort: drop broken connections
-                self.disconnect(connection)
-
-manager = ConnectionManager()
+hub = RoomHub(
+    shards=settings.CHAT_HUB_SHARDS,
+    queue_size=settings.CHAT_QUEUE_SIZE,
+    send_timeout=settings.CHAT_SEND_TIMEOUT_SECONDS,
+    policy=settings.CHAT_SLOW_CONSUMER_POLICY,
+)
 
 @router.websocket("/chat")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, room: str = "lobby"):
+    """Echo every text frame to all members of `room` (default: lobby)."""
+    await websocket.accept()
+    conn = hub.connect(websocket, rooms=[room])
     try:
-        while True:
+        while not conn.closed:
             data = await websocket.receive_text()
-            await manager.broadcast(data)
+            await hub.publish(room, data)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        await manager.broadcast("A user left the chat")
+        pass
+    finally:
+        was_member = not conn.closed
+        hub.disconnect(conn)
+        if was_member:
+            await hub.publish(room, "A user left the chat")
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from uuid import uuid4
 from datetime import datetime
+from typing import Optional
 from app.core.database import db
+from app.core.pagination import decode_cursor, paginate, set_next_cursor
+from app.core.response_cache import cached_json, invalidate, post_tag
 from app.core.security import get_current_user
 from app.schemas.comment_schema import CommentCreate, CommentUpdate
 
@@ -21,17 +24,11 @@ def create_comment(
     created_at = datetime.utcnow().isoformat() + "Z"
 
     with db.get_session() as session:
-        # Check if post exists first
-        exists = session.run("MATCH (p:Post {id: $id}) RETURN p", id=post_id).single()
-        if not exists:
-            raise HTTPException(status_code=404, detail="Post not found")
-
-        # ✅ FIXED QUERY: Added WITH between MERGE and MATCH
-        session.run(
+        # Matching the post first makes a missing post yield no row (404)
+        created = session.run(
             """
-            MERGE (u:User {id: $uid})
-            WITH u
             MATCH (p:Post {id: $pid})
+            MERGE (u:User {id: $uid})
             CREATE (c:Comment {
                 id: $id,
                 content: $content,
@@ -39,16 +36,22 @@ def create_comment(
             })
             MERGE (u)-[:AUTHORED]->(c)
             MERGE (c)-[:ON_POST]->(p)
+            SET p.comments_count = coalesce(p.comments_count, 0) + 1
+            RETURN c.id as id
             """,
             uid=current_user["id"],
             pid=post_id,
             id=comment_id,
             content=payload.content,
             created_at=created_at,
-        )
+        ).single()
+        if not created:
+            raise HTTPException(status_code=404, detail="Post not found")
 
         user_data = current_user.copy()
         user_data.pop("password", None)
+    # The post's comment list and comments_count both changed
+    invalidate(post_tag(post_id))
 
     return {
         "id": comment_id,
@@ -62,27 +65,67 @@ def create_comment(
 # -----------------------------
 # GET COMMENTS FOR A POST
 # -----------------------------
-@router.get("/{post_id}/comments")
-def get_comments_for_post(post_id: str):
+def _load_comments(post_id: str, limit: int, cursor: Optional[str]) -> tuple:
+    """One oldest-first page of comments with public author fields only.
+    Returns (comments, next_cursor).
+    """
+    params = {"pid": post_id, "limit": limit + 1}
+    conditions = ["c.created_at IS NOT NULL"]
+    if cursor:
+        after_ts, after_id = decode_cursor(cursor)
+        conditions.append("c.created_at >= $after_ts")
+        conditions.append("(c.created_at > $after_ts OR c.id > $after_id)")
+        params.update(after_ts=after_ts, after_id=after_id)
+
     with db.get_session() as session:
         results = session.run(
-            """
-            MATCH (u:User)-[:AUTHORED]->(c:Comment)-[:ON_POST]->(p:Post {id: $pid})
-            RETURN c, u
-            ORDER BY c.created_at ASC
+            f"""
+            MATCH (p:Post {{id: $pid}})<-[:ON_POST]-(c:Comment)<-[:AUTHORED]-(u:User)
+            WHERE {" AND ".join(conditions)}
+            RETURN c.id AS id, c.content AS content, c.created_at AS created_at,
+                   c.updated_at AS updated_at,
+                   u.id AS user_id, u.username AS username, u.name AS name,
+                   coalesce(u.avatar_small_url, u.avatar_url) AS avatar_url
+            ORDER BY c.created_at ASC, c.id ASC
+            LIMIT $limit
             """,
-            pid=post_id,
+            **params,
         )
+        comments = [
+            {
+                "id": r["id"],
+                "content": r["content"],
+                "created_at": r["created_at"],
+                "updated_at": r["updated_at"],
+                "user": {
+                    "id": r["user_id"],
+                    "username": r["username"],
+                    "name": r["name"],
+                    "avatar_url": r["avatar_url"],
+                },
+            }
+            for r in results
+        ]
+
+    return paginate(comments, limit, lambda c: (c["created_at"], c["id"]))
 
-        comments = []
-        for record in results:
-            comment = dict(record["c"])
-            user = dict(record["u"])
-            user.pop("password", None)
-            comment["user"] = user
-            comments.append(comment)
 
-    return comments
+@router.get("/{post_id}/comments")
+def get_comments_for_post(
+    post_id: str,
+    request: Request,
+    limit: int = Query(50, ge=1, le=200, description="Comments per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+):
+    """Oldest-first page of a post's comments, keyset-paginated over (created_at, id).
+    Pages are cached under the post's tag, which every comment write drops.
+    """
+    def build(response: Response) -> list:
+        page, next_cursor = _load_comments(post_id, limit, cursor)
+        set_next_cursor(response, next_cursor)
+        return page
+
+    return cached_json(request, post_tag(post_id), build)
 
 
 # -----------------------------
@@ -100,7 +143,8 @@ def update_comment(
         record = session.run(
             """
             MATCH (u:User {id: $uid})-[:AUTHORED]->(c:Comment {id: $cid})
-            RETURN c
+            OPTIONAL MATCH (c)-[:ON_POST]->(p:Post)
+            RETURN c, p.id AS post_id
             """,
             uid=current_user["id"],
             cid=comment_id,
@@ -119,6 +163,8 @@ def update_comment(
             content=payload.content,
             updated_at=updated_at,
         )
+    if record["post_id"]:
+        invalidate(post_tag(record["post_id"]))
 
     return {"message": "Comment updated successfully", "updated_at": updated_at}
 
@@ -135,7 +181,8 @@ def delete_comment(
         record = session.run(
             """
             MATCH (u:User {id: $uid})-[:AUTHORED]->(c:Comment {id: $cid})
-            RETURN c
+            OPTIONAL MATCH (c)-[:ON_POST]->(p:Post)
+            RETURN c, p.id AS post_id
             """,
             uid=current_user["id"],
             cid=comment_id,
@@ -147,10 +194,14 @@ def delete_comment(
         session.run(
             """
             MATCH (c:Comment {id: $cid})
+            OPTIONAL MATCH (c)-[:ON_POST]->(p:Post)
+            SET p.comments_count = CASE WHEN coalesce(p.comments_count, 0) > 0 THEN p.comments_count - 1 ELSE 0 END
             DETACH DELETE c
             """,
             cid=comment_id,
         )
+    if record["post_id"]:
+        invalidate(post_tag(record["post_id"]))
 
     return {"message": "Comment deleted successfully"}
 
@@ -1,65 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field, model_validator
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
-import os
 import uuid
 
-from neo4j import GraphDatabase, basic_auth
 from neo4j.exceptions import SessionExpired, ServiceUnavailable, Neo4jError
 
+from app.core.counters import REPOINT_LAST_MESSAGE_CYPHER
+from app.core.database import db, async_db
+from app.core.pagination import decode_cursor, paginate, set_next_cursor
+from app.core.schema import migrations_applied
 from app.core.security import get_current_user
 
 router = APIRouter(prefix="/messages", tags=["Messages"])
 
-# ================== Neo4j Aura config (lazy init) ==================
-try:
-    # Prefer central settings if available
-    from app.core.config import settings as _settings  # type: ignore
-except Exception:
-    _settings = None
-
-NEO4J_URI = os.getenv("NEO4J_URI") or (getattr(_settings, "NEO4J_URI", None) if _settings else None)
-# Accept both NEO4J_USER and NEO4J_USERNAME for compatibility with Render env naming
-NEO4J_USER = (
-    os.getenv("NEO4J_USER")
-    or os.getenv("NEO4J_USERNAME")
-    or (getattr(_settings, "NEO4J_USER", None) if _settings else None)
-    or (getattr(_settings, "NEO4J_USERNAME", None) if _settings else None)
-)
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD") or (getattr(_settings, "NEO4J_PASSWORD", None) if _settings else None)
-NEO4J_DATABASE = os.getenv("NEO4J_DATABASE") or (getattr(_settings, "NEO4J_DATABASE", "neo4j") if _settings else "neo4j")
-
-_driver = None
-_constraints_ready = False
-
-def _get_driver():
-    global _driver
-    if _driver is None:
-        if not (NEO4J_URI and NEO4J_USER and NEO4J_PASSWORD):
-            raise HTTPException(status_code=500, detail="Neo4j configuration missing: set NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD")
-        try:
-            _driver = GraphDatabase.driver(NEO4J_URI, auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD))
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to connect to Neo4j: {e}")
-    return _driver
+# ================== Neo4j access (shared pooled drivers) ==================
 
 
 def run_query(cypher: str, **params):
     """Execute a Cypher query and return a MATERIALIZED list of records.
     Avoids using Result outside session to prevent 'result has been consumed'."""
-    global _driver
     attempts = 0
     last_err: Exception | None = None
     while attempts < 3:
         attempts += 1
         try:
-            drv = _get_driver()
-            with drv.session(database=NEO4J_DATABASE) as session:
+            with db.get_session() as session:
                 result = session.run(cypher, **params)
                 return list(result)
         except (SessionExpired, ServiceUnavailable, OSError) as e:
-            _driver = None
+            # The pool discards broken connections itself; just retry
             last_err = e
             continue
         except Neo4jError as e:
@@ -73,17 +43,35 @@ def run_query(cypher: str, **params):
 
 def run_single(cypher: str, **params):
     """Execute a Cypher query and return a SINGLE record, consumed within the session."""
-    global _driver
     attempts = 0
     last_err: Exception | None = None
     while attempts < 2:
         attempts += 1
         try:
-            drv = _get_driver()
-            with drv.session(database=NEO4J_DATABASE) as session:
+            with db.get_session() as session:
                 return session.run(cypher, **params).single()
         except (SessionExpired, ServiceUnavailable, OSError) as e:
-            _driver = None
+            # The pool discards broken connections itself; just retry
+            last_err = e
+            continue
+        except Neo4jError as e:
+            raise HTTPException(status_code=500, detail=f"Neo4j error: {e.message}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    raise HTTPException(status_code=500, detail=f"Database connection error: {last_err}")
+
+
+async def run_query_async(cypher: str, **params):
+    """Awaitable run_query for `async def` routes, backed by the shared async driver."""
+    attempts = 0
+    last_err: Exception | None = None
+    while attempts < 3:
+        attempts += 1
+        try:
+            return await async_db.run_query(cypher, **params)
+        except (SessionExpired, ServiceUnavailable, OSError) as e:
             last_err = e
             continue
         except Neo4jError as e:
@@ -95,34 +83,17 @@ def run_single(cypher: str, **params):
     raise HTTPException(status_code=500, detail=f"Database connection error: {last_err}")
 
 
-def _ensure_constraints_once():
-    """Ensure required Neo4j constraints exist. Runs once per process and fails safe."""
-    global _constraints_ready
-    if _constraints_ready:
-        return
+async def write_single_async(cypher: str, **params):
+    """Run a write statement as a managed transaction (driver retries transient
+    failures itself) and return its single record."""
     try:
-        drv = _get_driver()
-        with drv.session(database=NEO4J_DATABASE) as session:
-            session.run(
-                """
-                CREATE CONSTRAINT conversation_id_unique IF NOT EXISTS
-                FOR (c:Conversation)
-                REQUIRE c.id IS UNIQUE
-                """
-            )
-            # Backfill: ensure 'profile_pic' property key exists on all User nodes to avoid warnings
-            session.run(
-                """
-                MATCH (u:User)
-                WHERE NOT exists(u.profile_pic)
-                SET u.profile_pic = ''
-                """
-            )
-    except Exception:
-        # Do not fail if constraint creation is not permitted or APOC missing, etc.
-        pass
-    finally:
-        _constraints_ready = True
+        return await async_db.write_single(cypher, **params)
+    except Neo4jError as e:
+        raise HTTPException(status_code=500, detail=f"Neo4j error: {e.message}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
 
 # ================== Pydantic bodies (match frontend) ==================
@@ -162,47 +133,51 @@ def _convo_id_for_pair(a: str, b: str) -> str:
     return f"convo:{u1}:{u2}"
 
 
+_ENSURE_USER_CYPHER = (
+    "MERGE (u:User {id: $id})\n"
+    "ON CREATE SET u.username = COALESCE($username, $id), u.profile_pic = COALESCE($profile_pic, null)\n"
+    "RETURN u.id as id"
+)
+
+_ENSURE_CONVERSATION_CYPHER = (
+    "MERGE (c:Conversation {id: $cid})\n"
+    "  ON CREATE SET c.created_at = $now\n"
+    "WITH c\n"
+    "MATCH (u1:User {id: $me})\n"
+    "MATCH (u2:User {id: $other})\n"
+    "MERGE (u1)-[:PARTICIPATES_IN]->(c)\n"
+    "MERGE (u2)-[:PARTICIPATES_IN]->(c)\n"
+    "RETURN c.id as id, c.created_at as created_at"
+)
+
+_PARTICIPANTS_CYPHER = "MATCH (u:User)-[:PARTICIPATES_IN]->(c:Conversation {id: $cid}) RETURN u.id as id"
+
+
 def _ensure_user(user_id: str, username: Optional[str] = None, profile_pic: Optional[str] = None):
-    cypher = (
-        "MERGE (u:User {id: $id})\n"
-        "ON CREATE SET u.username = COALESCE($username, $id), u.profile_pic = COALESCE($profile_pic, null)\n"
-        "RETURN u.id as id"
-    )
-    run_query(cypher, id=str(user_id), username=username, profile_pic=profile_pic)
+    run_query(_ENSURE_USER_CYPHER, id=str(user_id), username=username, profile_pic=profile_pic)
 
 
 def _ensure_conversation(me: str, other: str) -> Dict[str, Any]:
     cid = _convo_id_for_pair(str(me), str(other))
-    cypher = (
-        "MERGE (c:Conversation {id: $cid})\n"
-        "  ON CREATE SET c.created_at = $now\n"
-        "WITH c\n"
-        "MATCH (u1:User {id: $me})\n"
-        "MATCH (u2:User {id: $other})\n"
-        "MERGE (u1)-[:PARTICIPATES_IN]->(c)\n"
-        "MERGE (u2)-[:PARTICIPATES_IN]->(c)\n"
-        "RETURN c.id as id, c.created_at as created_at"
-    )
-    rec = run_single(cypher, cid=cid, now=_iso_now(), me=str(me), other=str(other))
+    rec = run_single(_ENSURE_CONVERSATION_CYPHER, cid=cid, now=_iso_now(), me=str(me), other=str(other))
     if not rec:
         raise HTTPException(status_code=500, detail="Failed to create conversation")
     return {"id": rec["id"], "created_at": rec["created_at"]}
 
 
-def _get_conversation_participants(conversation_id: str) -> List[str]:
-    cypher = "MATCH (u:User)-[:PARTICIPATES_IN]->(c:Conversation {id: $cid}) RETURN u.id as id"
-    rows = run_query(cypher, cid=conversation_id)
+def _participant_ids(rows) -> List[str]:
     ids = [str(r["id"]) for r in rows]
     if len(ids) != 2:
         raise HTTPException(status_code=404, detail="Conversation not found or invalid")
     return ids
 
 
-def _other_of(participants: List[str], me: str) -> str:
-    for p in participants:
-        if str(p) != str(me):
-            return str(p)
-    raise HTTPException(status_code=400, detail="Invalid conversation participants")
+def _get_conversation_participants(conversation_id: str) -> List[str]:
+    return _participant_ids(run_query(_PARTICIPANTS_CYPHER, cid=conversation_id))
+
+
+async def _get_conversation_participants_async(conversation_id: str) -> List[str]:
+    return _participant_ids(await run_query_async(_PARTICIPANTS_CYPHER, cid=conversation_id))
 
 
 def _is_admin(user: Dict[str, Any]) -> bool:
@@ -249,17 +224,61 @@ def _conversation_row_to_json(r) -> Dict[str, Any]:
 # ================== Routes ==================
 # Optional Socket.IO import (non-fatal if missing)
 try:
-    from app.sockets import sio  # type: ignore
+    from app.sockets import sio, emit_to_user  # type: ignore
 except Exception:
     sio = None
 
 
+# ---- Send path: one managed write transaction, one statement ----
+# Both variants bind s (sender), r (recipient), c and rp (recipient's
+# PARTICIPATES_IN) and then share the same tail.
+_SEND_TAIL_CYPHER = (
+    "CREATE (m:Message {id: $mid, conversation_id: c.id, content: $content, timestamp: $now, created_at: $now,\n"
+    "                   sender_id: s.id, receiver_id: r.id})\n"
+    "CREATE (s)-[:SENT]->(m)\n"
+    "CREATE (c)-[:HAS_MESSAGE]->(m)\n"
+    # Setting c first takes its write lock, so concurrent sends move the pointer one at a time
+    "SET c.last_message_at = $now\n"
+    "WITH c, m, r, rp\n"
+    "OPTIONAL MATCH (c)-[old:LAST_MESSAGE]->()\n"
+    "DELETE old\n"
+    "WITH DISTINCT c, m, r, rp\n"
+    "CREATE (c)-[:LAST_MESSAGE]->(m)\n"
+    "SET rp.unread_count = COALESCE(rp.unread_count, 0) + 1\n"
+    "RETURN c.id as conversation_id, r.id as recipient_id, rp.unread_count as recipient_unread,\n"
+    "       m.id as id, m.content as content, m.timestamp as timestamp, m.sender_id as sender_id"
+)
+
+# Existing conversation: authorization is the MATCH itself (no row = not allowed)
+_SEND_TO_CONVERSATION_CYPHER = (
+    "MATCH (s:User {id: $sid})-[:PARTICIPATES_IN]->(c:Conversation {id: $cid})<-[rp:PARTICIPATES_IN]-(r:User)\n"
+    "WHERE r.id <> s.id\n"
+    "WITH s, c, r, rp LIMIT 1\n"
+    + _SEND_TAIL_CYPHER
+)
+
+# By recipient id: upsert the pair conversation (same semantics as /start)
+_SEND_TO_USER_CYPHER = (
+    "MATCH (s:User {id: $sid})\n"
+    "MERGE (r:User {id: $rid})\n"
+    "  ON CREATE SET r.username = $rid, r.profile_pic = null\n"
+    "MERGE (c:Conversation {id: $cid})\n"
+    "  ON CREATE SET c.created_at = $now\n"
+    "MERGE (s)-[:PARTICIPATES_IN]->(c)\n"
+    "MERGE (r)-[rp:PARTICIPATES_IN]->(c)\n"
+    "WITH s, c, r, rp\n"
+    + _SEND_TAIL_CYPHER
+)
+
+
 @router.post("/send")
 async def send_and_create_if_needed(body: SendMessageRequest, current_user: Dict[str, Any] = Depends(get_current_user)):
     """
     Single endpoint to send a message. Auto-creates conversation if missing.
     Input: { user_id, content }
     Returns: { conversation_id, message: { id, content, timestamp, sender_id } }
+    Authorization, conversation upsert, message creation and counter updates
+    run as one write transaction (a single round-trip).
     """
     content = (body.content or "").strip()
     if not content:
@@ -267,52 +286,26 @@ async def send_and_create_if_needed(body: SendMessageRequest, current_user: Dict
 
     try:
         me = str(current_user["id"])  # current user id from auth (string/UUID)
-        # Determine conversation and other participant
-        conversation_id = body.conversation_id
-        other = body.user_id if body.user_id is not None else None
-
-        if other is not None and me == str(other):
-            raise HTTPException(status_code=422, detail="Cannot message yourself")
-
-        # Ensure users and conversation exist / or validate provided conversation
-        _ensure_user(me, username=str(current_user.get("username") or me), profile_pic=current_user.get("profile_pic"))
-        if conversation_id:
-            # Ensure user participates
-            parts = _get_conversation_participants(conversation_id)
-            if me not in parts:
+        params = {"sid": me, "mid": str(uuid.uuid4()), "content": content, "now": _iso_now()}
+
+        if body.conversation_id:
+            # The recipient is derived from the conversation; body.user_id is ignored
+            rec = await write_single_async(_SEND_TO_CONVERSATION_CYPHER, cid=str(body.conversation_id), **params)
+            if not rec:
+                # Cold path: tell a missing conversation (404) from a foreign one (403)
+                await _get_conversation_participants_async(str(body.conversation_id))
                 raise HTTPException(status_code=403, detail="Not a participant in this conversation")
         else:
-            if not other:
-                raise HTTPException(status_code=422, detail="user_id is required when conversation_id is not provided")
-            other = str(other)
-            _ensure_user(other)
-            convo = _ensure_conversation(me, other)
-            conversation_id = convo["id"]
-
-        # Create message with required 'timestamp' property
-        mid = str(uuid.uuid4())
-        now = _iso_now()
-        cypher = (
-            "MATCH (c:Conversation {id: $cid})\n"
-            "MATCH (s:User {id: $sid})\n"
-            "MATCH (r:User {id: $rid})\n"
-            "CREATE (m:Message {id: $mid, content: $content, timestamp: $now, created_at: $now, sender_id: $sid, receiver_id: $rid})\n"
-            "MERGE (s)-[:SENT]->(m)\n"
-            "MERGE (c)-[:HAS_MESSAGE]->(m)\n"
-            "RETURN m.id as id, m.content as content, m.timestamp as timestamp, m.sender_id as sender_id"
-        )
-        rec = run_single(
-            cypher,
-            cid=str(conversation_id),
-            sid=str(me),
-            rid=str(_other_of(_get_conversation_participants(conversation_id), me) if not other else other),
-            mid=mid,
-            content=content,
-            now=now,
-        )
-        if not rec:
-            raise HTTPException(status_code=500, detail="Failed to create message")
+            other = str(body.user_id)
+            if me == other:
+                raise HTTPException(status_code=422, detail="Cannot message yourself")
+            rec = await write_single_async(
+                _SEND_TO_USER_CYPHER, rid=other, cid=_convo_id_for_pair(me, other), **params
+            )
+            if not rec:
+                raise HTTPException(status_code=500, detail="Failed to create message")
 
+        conversation_id = rec["conversation_id"]
         message = {
             "id": rec["id"],
             "content": rec["content"],
@@ -327,6 +320,16 @@ async def send_and_create_if_needed(body: SendMessageRequest, current_user: Dict
             except Exception:
                 # Do not fail the request if socket emit fails
                 pass
+            # Inbox ordering for both sides and the recipient's new unread
+            # count, pushed to user rooms so clients need not poll
+            recipient_id = str(rec["recipient_id"])
+            update = {"conversation_id": conversation_id, "last_message": message}
+            await emit_to_user(me, "conversation:updated", update)
+            await emit_to_user(recipient_id, "conversation:updated", update)
+            await emit_to_user(recipient_id, "unread:update", {
+                "conversation_id": conversation_id,
+                "unread_count": int(rec["recipient_unread"] or 0),
+            })
 
         return {"conversation_id": conversation_id, "message": message}
     except HTTPException:
@@ -335,32 +338,93 @@ async def send_and_create_if_needed(body: SendMessageRequest, current_user: Dict
         raise HTTPException(status_code=500, detail=f"Failed to send message: {e}")
 
 
+# Authorization and page fetch in one round-trip. No row means the
+# conversation does not exist; `allowed` false means the caller is not in it.
+# Seeks the message_conversation_created_at index (migration 9) on
+# conversation_id and a created_at range, so a page reads about `limit` rows
+_MESSAGE_PAGE_CYPHER = (
+    "MATCH (c:Conversation {id: $cid})\n"
+    "WITH c, size([(:User {id: $me})-[:PARTICIPATES_IN]->(c) | 1]) > 0 AS allowed\n"
+    "OPTIONAL MATCH (m:Message)\n"
+    "WHERE allowed AND m.conversation_id = $cid AND m.created_at IS NOT NULL\n"
+    "  AND ($before_ts IS NULL\n"
+    "       OR (m.created_at <= $before_ts\n"
+    "           AND (m.created_at < $before_ts OR m.id < $before_id)))\n"
+    "WITH allowed, m\n"
+    "ORDER BY m.created_at DESC, m.id DESC\n"
+    "LIMIT $limit\n"
+    "RETURN allowed, collect(CASE WHEN m IS NULL THEN NULL ELSE\n"
+    "       {id: m.id, content: m.content, timestamp: m.created_at, sender_id: m.sender_id} END) AS messages"
+)
+
+# Until migrations 8 and 9 have backfilled created_at and conversation_id:
+# expands every HAS_MESSAGE edge and sorts, but sees every message
+_MESSAGE_PAGE_SCAN_CYPHER = (
+    "MATCH (c:Conversation {id: $cid})\n"
+    "WITH c, size([(:User {id: $me})-[:PARTICIPATES_IN]->(c) | 1]) > 0 AS allowed\n"
+    "OPTIONAL MATCH (c)-[:HAS_MESSAGE]->(m:Message)\n"
+    "WHERE allowed\n"
+    "  AND ($before_ts IS NULL\n"
+    "       OR COALESCE(m.created_at, m.timestamp) < $before_ts\n"
+    "       OR (COALESCE(m.created_at, m.timestamp) = $before_ts AND m.id < $before_id))\n"
+    "WITH allowed, m, COALESCE(m.created_at, m.timestamp) AS ts\n"
+    "ORDER BY ts DESC, m.id DESC\n"
+    "LIMIT $limit\n"
+    "RETURN allowed, collect(CASE WHEN m IS NULL THEN NULL ELSE\n"
+    "       {id: m.id, content: m.content, timestamp: ts, sender_id: m.sender_id} END) AS messages"
+)
+
+
+def _message_page(conversation_id: str, me: str, limit: int, before: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Latest `limit` messages older than the `before` cursor, returned ascending,
+    plus the cursor for the next (older) page.
+    """
+    before_ts, before_id = decode_cursor(before) if before else (None, None)
+    cypher = _MESSAGE_PAGE_CYPHER if migrations_applied(8, 9) else _MESSAGE_PAGE_SCAN_CYPHER
+    rows = run_query(
+        cypher,
+        cid=str(conversation_id),
+        me=me,
+        before_ts=before_ts,
+        before_id=before_id,
+        limit=limit + 1,
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Conversation not found or invalid")
+    if not rows[0]["allowed"]:
+        raise HTTPException(status_code=403, detail="Not a participant in this conversation")
+
+    newest_first = [
+        {
+            "id": m["id"],
+            "content": m["content"],
+            "timestamp": m["timestamp"],
+            "sender_id": str(m["sender_id"]),
+        }
+        for m in rows[0]["messages"]
+    ]
+    page, next_cursor = paginate(newest_first, limit, lambda m: (m["timestamp"], m["id"]))
+    page.reverse()
+    return page, next_cursor
+
+
 @router.get("")
-def get_messages(conversation_id: str = Query(..., description="Conversation ID"), current_user: Dict[str, Any] = Depends(get_current_user)):
+def get_messages(
+    response: Response,
+    conversation_id: str = Query(..., description="Conversation ID"),
+    limit: int = Query(50, ge=1, le=200, description="Max messages to return"),
+    before: Optional[str] = Query(None, description="Cursor from X-Next-Cursor to load older messages"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
     """
-    Return all messages in a conversation ascending by time in the shape:
+    Return the latest messages in a conversation ascending by time in the shape:
     [ { id, content, timestamp, sender_id }, ... ]
+    Older pages are fetched by passing the X-Next-Cursor header value as `before`.
     """
     try:
-        me = str(current_user["id"])
-        parts = _get_conversation_participants(conversation_id)
-        if str(me) not in parts:
-            raise HTTPException(status_code=403, detail="Not a participant in this conversation")
-        cypher = (
-            "MATCH (c:Conversation {id: $cid})-[:HAS_MESSAGE]->(m:Message)\n"
-            "RETURN m.id as id, m.content as content, COALESCE(m.timestamp, m.created_at) as timestamp, m.sender_id as sender_id\n"
-            "ORDER BY timestamp ASC"
-        )
-        rows = run_query(cypher, cid=str(conversation_id))
-        return [
-            {
-                "id": r["id"],
-                "content": r["content"],
-                "timestamp": r["timestamp"],
-                "sender_id": str(r["sender_id"]),
-            }
-            for r in rows
-        ]
+        page, next_cursor = _message_page(conversation_id, str(current_user["id"]), limit, before)
+        set_next_cursor(response, next_cursor)
+        return page
     except HTTPException:
         raise
     except Exception as e:
@@ -370,34 +434,20 @@ def get_messages(conversation_id: str = Query(..., description="Conversation ID"
 @router.get("/by/{conversation_id}")
 def get_messages_by_path(
     conversation_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Max messages to return"),
+    before: Optional[str] = Query(None, description="Cursor from X-Next-Cursor to load older messages"),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
     Alternative path-based version:
     GET /messages/by/{conversation_id}
-    Returns all messages for a conversation in ascending timestamp order.
+    Same paging as GET /messages.
     """
     try:
-        me = str(current_user["id"])
-        parts = _get_conversation_participants(conversation_id)
-        if me not in parts:
-            raise HTTPException(status_code=403, detail="Not a participant in this conversation")
-
-        cypher = (
-            "MATCH (c:Conversation {id: $cid})-[:HAS_MESSAGE]->(m:Message)\n"
-            "RETURN m.id as id, m.content as content, COALESCE(m.timestamp, m.created_at) as timestamp, m.sender_id as sender_id\n"
-            "ORDER BY timestamp ASC"
-        )
-        rows = run_query(cypher, cid=str(conversation_id))
-        return [
-            {
-                "id": r["id"],
-                "content": r["content"],
-                "timestamp": r["timestamp"],
-                "sender_id": str(r["sender_id"]),
-            }
-            for r in rows
-        ]
+        page, next_cursor = _message_page(conversation_id, str(current_user["id"]), limit, before)
+        set_next_cursor(response, next_cursor)
+        return page
     except HTTPException:
         raise
     except Exception as e:
@@ -516,55 +566,49 @@ def get_conversation_with(user_id: str, current_user: Dict[str, Any] = Depends(g
 
 @router.get("/conversations")
 def get_conversations(
+    response: Response,
     limit: int = Query(20, ge=1, le=100, description="Max conversations to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor (takes precedence over offset)"),
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
     """Return user's conversations with last message and other participant.
-    Supports pagination with limit/offset. Orders by last message timestamp desc.
-    Uses APOC property access if available to avoid warnings on missing properties.
+    Pages over conversations ordered by their stored `last_message_at` (desc),
+    reading only the LAST_MESSAGE pointer instead of every message.
     """
     try:
-        _ensure_constraints_once()
         me = str(current_user["id"])
+        after_ts, after_id = decode_cursor(cursor) if cursor else (None, None)
 
-        # Try with APOC first to avoid missing property warnings
-        apoc_cypher = (
-            "MATCH (me:User {id:$me})-[:PARTICIPATES_IN]->(c:Conversation)<-[:PARTICIPATES_IN]-(other:User)\n"
-            "MATCH (c)-[:HAS_MESSAGE]->(m:Message)\n"
-            "WITH c, other, m\n"
-            "ORDER BY m.timestamp DESC\n"
-            "WITH c, other, head(collect(m)) AS last\n"
-            "RETURN c.id AS cid, other.id AS oid, other.username AS ousername,\n"
-            "       coalesce(apoc.property(other, 'profile_pic'), other.avatar_url, '') AS opic,\n"
+        cypher = (
+            "MATCH (me:User {id:$me})-[mp:PARTICIPATES_IN]->(c:Conversation)\n"
+            "WHERE c.last_message_at IS NOT NULL\n"
+            "  AND ($after_ts IS NULL OR c.last_message_at < $after_ts\n"
+            "       OR (c.last_message_at = $after_ts AND c.id < $after_id))\n"
+            "WITH c, COALESCE(mp.unread_count, 0) AS unread\n"
+            "ORDER BY c.last_message_at DESC, c.id DESC\n"
+            "SKIP $offset LIMIT $limit\n"
+            "MATCH (c)<-[:PARTICIPATES_IN]-(other:User)\n"
+            "WHERE other.id <> $me\n"
+            "OPTIONAL MATCH (c)-[:LAST_MESSAGE]->(last:Message)\n"
+            "RETURN c.id AS cid, c.last_message_at AS last_at, unread,\n"
+            "       other.id AS oid, other.username AS ousername,\n"
+            "       CASE WHEN COALESCE(other.profile_pic, '') <> '' THEN other.profile_pic\n"
+            "            ELSE COALESCE(other.avatar_url, '') END AS opic,\n"
             "       last.id AS mid,\n"
             "       last.content AS mcontent,\n"
             "       last.timestamp AS mcreated,\n"
             "       last.sender_id AS msender\n"
-            "ORDER BY mcreated DESC\n"
-            "SKIP $offset LIMIT $limit"
+            "ORDER BY last_at DESC, cid DESC"
+        )
+        rows = run_query(
+            cypher,
+            me=me,
+            after_ts=after_ts,
+            after_id=after_id,
+            offset=0 if cursor else int(offset),
+            limit=int(limit) + 1,
         )
-
-        try:
-            rows = run_query(apoc_cypher, me=me, limit=int(limit), offset=int(offset))
-        except Exception:
-            # Fallback to plain COALESCE if APOC is unavailable or any error occurs
-            fallback_cypher = (
-                "MATCH (me:User {id:$me})-[:PARTICIPATES_IN]->(c:Conversation)<-[:PARTICIPATES_IN]-(other:User)\n"
-                "MATCH (c)-[:HAS_MESSAGE]->(m:Message)\n"
-                "WITH c, other, m\n"
-                "ORDER BY m.timestamp DESC\n"
-                "WITH c, other, head(collect(m)) AS last\n"
-                "RETURN c.id AS cid, other.id AS oid, other.username AS ousername,\n"
-                "      COALESCE(other.avatar_url, '') AS opic,\n"
-                "       last.id AS mid,\n"
-                "       last.content AS mcontent,\n"
-                "       last.timestamp AS mcreated,\n"
-                "       last.sender_id AS msender\n"
-                "ORDER BY mcreated DESC\n"
-                "SKIP $offset LIMIT $limit"
-            )
-            rows = run_query(fallback_cypher, me=me, limit=int(limit), offset=int(offset))
 
         # Build response
         convos: List[Dict[str, Any]] = []
@@ -576,8 +620,14 @@ def get_conversations(
                     {"id": r["mid"], "content": r["mcontent"], "timestamp": r["mcreated"], "sender_id": r["msender"]}
                     if r["mid"] else None
                 ),
+                "unread_count": int(r["unread"] or 0),
+                "_cursor": (r["last_at"], r["cid"]),
             })
-        return convos
+        page, next_cursor = paginate(convos, limit, lambda c: c["_cursor"])
+        for c in page:
+            del c["_cursor"]
+        set_next_cursor(response, next_cursor)
+        return page
     except HTTPException:
         raise
     except Exception as e:
@@ -585,34 +635,58 @@ def get_conversations(
 
 
 @router.post("/mark_read")
-def mark_read(body: MarkReadRequest, current_user: Dict[str, Any] = Depends(get_current_user)):
+async def mark_read(body: MarkReadRequest, current_user: Dict[str, Any] = Depends(get_current_user)):
     """
     Mark messages in a conversation as read for the current user (UUID-safe).
     Returns: { ok, count }
     """
     try:
         me = str(current_user["id"])
-        parts = _get_conversation_participants(body.conversation_id)
-        if me not in parts:
-            raise HTTPException(status_code=403, detail="Not a participant in this conversation")
 
+        # Reset the counter and move the read watermark; no per-message edges.
+        # The counter reconciler recounts unread_count from last_read_at.
         cypher = (
-            "MATCH (u:User {id: $uid})\n"
-            "MATCH (:Conversation {id: $cid})-[:HAS_MESSAGE]->(m:Message {receiver_id: $uid})\n"
-            "WHERE NOT (u)-[:READ_BY]->(m)\n"
-            "WITH u, m\n"
-            "MERGE (u)-[:READ_BY]->(m)\n"
-            "RETURN count(m) as marked"
+            "MATCH (:User {id: $uid})-[p:PARTICIPATES_IN]->(:Conversation {id: $cid})\n"
+            "WITH p, COALESCE(p.unread_count, 0) AS marked\n"
+            "SET p.unread_count = 0, p.last_read_at = $now\n"
+            "RETURN marked"
         )
-        rec = run_single(cypher, uid=me, cid=str(body.conversation_id))
-        count = int((rec and rec.get("marked")) or 0)
-        return {"ok": True, "count": count}
+        cid = str(body.conversation_id)
+        rec = await write_single_async(cypher, uid=me, cid=cid, now=_iso_now())
+        if not rec:
+            # Cold path: tell a missing conversation (404) from a foreign one (403)
+            await _get_conversation_participants_async(cid)
+            raise HTTPException(status_code=403, detail="Not a participant in this conversation")
+        if sio is not None:
+            # Keeps the user's other tabs and devices in step
+            await emit_to_user(me, "unread:update", {"conversation_id": cid, "unread_count": 0})
+        return {"ok": True, "count": int(rec["marked"] or 0)}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to mark read: {e}")
 
 
+@router.get("/unread")
+def get_unread_summary(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Unread counts for all of the caller's conversations in one query.
+    Returns: { total, conversations: { <conversation_id>: count } } (only non-zero entries)
+    """
+    try:
+        rows = run_query(
+            "MATCH (:User {id: $uid})-[p:PARTICIPATES_IN]->(c:Conversation)\n"
+            "WHERE p.unread_count > 0\n"
+            "RETURN c.id AS cid, p.unread_count AS unread",
+            uid=str(current_user["id"]),
+        )
+        counts = {r["cid"]: int(r["unread"]) for r in rows}
+        return {"total": sum(counts.values()), "conversations": counts}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load unread counts: {e}")
+
+
 # ================== Deletion Endpoints (backend-only) ==================
 @router.delete("/conversation/{conversation_id}")
 def delete_messages_in_conversation(conversation_id: str, current_user: Dict[str, Any] = Depends(get_current_user)):
@@ -694,6 +768,15 @@ def delete_messages_by_user(user_id: str, current_user: Dict[str, Any] = Depends
         )
         deleted = int(count_rec["cnt"] or 0) if count_rec else 0
 
+        # Conversations whose last message is about to disappear
+        affected = run_single(
+            """
+            MATCH (:User {id:$uid})-[:SENT]->(:Message)<-[:LAST_MESSAGE]-(c:Conversation)
+            RETURN collect(c.id) as cids
+            """,
+            uid=str(user_id),
+        )
+
         # Delete those messages
         run_query(
             """
@@ -711,6 +794,8 @@ def delete_messages_by_user(user_id: str, current_user: Dict[str, Any] = Depends
             DETACH DELETE c
             """,
         )
+        if affected and affected["cids"]:
+            run_query(REPOINT_LAST_MESSAGE_CYPHER, cids=affected["cids"])
 
         return {"success": True, "deleted_messages": deleted}
     except HTTPException:
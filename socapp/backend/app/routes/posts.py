@@ -1,20 +1,67 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, Body
-from app.core.database import db
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, Body, Query, Response
+from app.core.database import db, async_db
+from app.core.images import schedule_post_variants
+from app.core.config import settings
+from app.core.pagination import decode_cursor, paginate, set_next_cursor
+from app.core.response_cache import cached_json, invalidate, post_tag
+from app.core.timeline import get_timeline_backend
 from app.core.security import get_current_user
+from app.core.uploads import save_upload
 from uuid import uuid4
 from datetime import datetime
 from typing import Optional
-import os
+import logging
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
-UPLOADS_DIR = os.path.join(os.getcwd(), "uploads")
-os.makedirs(UPLOADS_DIR, exist_ok=True)
+logger = logging.getLogger(__name__)
 
 # ✅ Your Render backend URL (update if yours is different)
 BACKEND_URL = "https://socapp-backend.onrender.com"
 
 
+# Author properties safe to embed in post responses (never email/password)
+_AUTHOR_FIELDS = ("id", "username", "name", "bio", "profile_pic", "avatar_url", "avatar_small_url")
+
+
+def _post_from_record(rec, for_list: bool = False) -> dict:
+    """Post dict with the author's public fields and the counters stored on
+    the node. List views get the author's small avatar variant when one exists.
+    """
+    p = dict(rec["p"])
+    author = rec["u"]
+    p["user"] = {field: author.get(field) for field in _AUTHOR_FIELDS}
+    if for_list and p["user"].get("avatar_small_url"):
+        p["user"]["avatar_url"] = p["user"]["avatar_small_url"]
+    p["likes_count"] = p.get("likes_count") or 0
+    p["comments_count"] = p.get("comments_count") or 0
+    return p
+
+
+async def _fan_out_post(author_id: str, post_id: str, created_at: str) -> None:
+    """Push a new post into the warm timelines of the author's followers.
+    Authors above TIMELINE_FANOUT_MAX_FOLLOWERS are flagged (stickily) for
+    fan-out-on-read instead; the feed route pulls their posts at read time.
+    """
+    rec = await async_db.run_single(
+        """
+        MATCH (author:User {id: $uid})
+        WITH author,
+             coalesce(author.fanout_on_read, false)
+               OR size([(author)<-[:FOLLOWS]-(:User) | 1]) > $max_followers AS pull
+        SET author.fanout_on_read = pull
+        WITH author, pull
+        OPTIONAL MATCH (f:User)-[:FOLLOWS]->(author)
+        WHERE NOT pull
+        RETURN pull, collect(f.id) AS follower_ids
+        """,
+        uid=author_id,
+        max_followers=settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+    )
+    if rec and not rec["pull"]:
+        get_timeline_backend().push(rec["follower_ids"], (created_at, post_id))
+
+
 @router.post("/")
 async def create_post(
     request: Request,
@@ -22,6 +69,7 @@ async def create_post(
 ):
     # Determine payload source
     ct = request.headers.get("content-type", "").lower()
+    filename = None
     
     if ct.startswith("application/json"):
         # Handle JSON payload (Cloudinary URL)
@@ -46,14 +94,10 @@ async def create_post(
         image_url = None
         if image and hasattr(image, 'file'):  # It's an uploaded file
             try:
-                _, ext = os.path.splitext(image.filename or "")
-                if not ext:
-                    ext = ".jpg"
-                filename = f"{uuid4()}{ext}"
-                file_path = os.path.join(UPLOADS_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await image.read())
+                filename = await save_upload(image)
                 image_url = f"{BACKEND_URL}/uploads/{filename}"
+            except HTTPException:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to save image: {e}")
         else:
@@ -62,28 +106,38 @@ async def create_post(
     post_id = str(uuid4())
     created_at = datetime.utcnow().isoformat() + "Z"
 
-    with db.get_session() as session:
-        session.run(
-            """
-            MERGE (u:User {id: $author_id})
-            ON CREATE SET u.name = $name, u.username = $username, u.avatar_url = $avatar_url
-            CREATE (p:Post {
-                id: $id,
-                content: $content,
-                image_url: $image_url,
-                created_at: $created_at
-            })
-            MERGE (u)-[:AUTHORED]->(p)
-            """,
-            author_id=current_user["id"],
-            name=current_user.get("name"),
-            username=current_user.get("username"),
-            avatar_url=current_user.get("avatar_url"),
-            id=post_id,
-            content=content,
-            image_url=image_url,
-            created_at=created_at,
-        )
+    await async_db.run_query(
+        """
+        MERGE (u:User {id: $author_id})
+        ON CREATE SET u.name = $name, u.username = $username, u.avatar_url = $avatar_url
+        CREATE (p:Post {
+            id: $id,
+            content: $content,
+            image_url: $image_url,
+            created_at: $created_at,
+            likes_count: 0,
+            comments_count: 0
+        })
+        MERGE (u)-[:AUTHORED]->(p)
+        """,
+        author_id=current_user["id"],
+        name=current_user.get("name"),
+        username=current_user.get("username"),
+        avatar_url=current_user.get("avatar_url"),
+        id=post_id,
+        content=content,
+        image_url=image_url,
+        created_at=created_at,
+    )
+
+    if filename:
+        schedule_post_variants(post_id, filename, image_url)
+
+    try:
+        await _fan_out_post(current_user["id"], post_id, created_at)
+    except Exception as e:
+        # The post exists; followers pick it up when their timeline is rebuilt
+        logger.warning(f"Timeline fan-out failed for post {post_id}: {e}")
 
     return {
         "id": post_id,
@@ -106,16 +160,16 @@ async def update_post(
     current_user: dict = Depends(get_current_user),
 ):
     # Ensure ownership
-    with db.get_session() as session:
-        rel = session.run(
-            "MATCH (u:User {id: $uid})-[:AUTHORED]->(p:Post {id: $pid}) RETURN p",
-            uid=current_user["id"], pid=post_id,
-        ).single()
-        if not rel:
-            raise HTTPException(status_code=403, detail="Not authorized")
+    rel = await async_db.run_single(
+        "MATCH (u:User {id: $uid})-[:AUTHORED]->(p:Post {id: $pid}) RETURN p",
+        uid=current_user["id"], pid=post_id,
+    )
+    if not rel:
+        raise HTTPException(status_code=403, detail="Not authorized")
 
     # Determine payload source
     ct = request.headers.get("content-type", "").lower()
+    filename = None
     
     if ct.startswith("application/json"):
         # Handle JSON payload (Cloudinary URL)
@@ -136,14 +190,10 @@ async def update_post(
         image_url = None
         if image and hasattr(image, 'file'):  # It's an uploaded file
             try:
-                _, ext = os.path.splitext(image.filename or "")
-                if not ext:
-                    ext = ".jpg"
-                filename = f"{uuid4()}{ext}"
-                file_path = os.path.join(UPLOADS_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await image.read())
+                filename = await save_upload(image)
                 image_url = f"{BACKEND_URL}/uploads/{filename}"
+            except HTTPException:
+                raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to save image: {e}")
         else:
@@ -157,96 +207,97 @@ async def update_post(
     if image_url is not None or 'image_url' in (await request.json() if ct.startswith("application/json") else {}):
         updates["image_url"] = image_url
 
-    with db.get_session() as session:
+    async with async_db.get_session() as session:
         if updates:
-            session.run("MATCH (p:Post {id: $id}) SET p += $updates", id=post_id, updates=updates)
+            # A replaced image invalidates its derivatives
+            await session.run(
+                """
+                MATCH (p:Post {id: $id})
+                SET p.image_feed_url = CASE
+                    WHEN 'image_url' IN keys($updates)
+                         AND coalesce(p.image_url, '') <> coalesce($updates.image_url, '')
+                    THEN null ELSE p.image_feed_url END
+                SET p += $updates
+                """,
+                id=post_id,
+                updates=updates,
+            )
 
-        rec = session.run(
-            """
-            MATCH (u:User)-[:AUTHORED]->(p:Post {id: $id})
-            OPTIONAL MATCH (p)<-[:LIKED]-(l:User)
-            OPTIONAL MATCH (c:Comment)-[:ON_POST]->(p)
-            RETURN p, u,
-                   count(DISTINCT l) as likes_count,
-                   count(DISTINCT c) as comments_count
-            """,
+        result = await session.run(
+            "MATCH (u:User)-[:AUTHORED]->(p:Post {id: $id}) RETURN p, u",
             id=post_id,
-        ).single()
+        )
+        rec = await result.single()
+    invalidate(post_tag(post_id))
+    if filename:
+        schedule_post_variants(post_id, filename, image_url)
 
-        if not rec:
-            return {"id": post_id, **updates}
+    if not rec:
+        return {"id": post_id, **updates}
 
-        p = dict(rec["p"])
-        p["user"] = dict(rec["u"])
-        p["likes_count"] = rec["likes_count"]
-        p["comments_count"] = rec["comments_count"]
-        return p
+    return _post_from_record(rec)
 
 
 # Keep the other endpoints (get_posts, get_post, delete_post, like_post) the same as in your original code
 @router.get("/")
-def get_posts(user_id: Optional[str] = None):
+def get_posts(
+    response: Response,
+    user_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100, description="Posts per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+):
+    """Newest-first page of posts, optionally for a single author.
+    Keyset pagination over (created_at, id) so each page is an index range scan.
+    """
+    params = {"limit": limit + 1}
+    conditions = ["p.created_at IS NOT NULL"]
+    if cursor:
+        after_ts, after_id = decode_cursor(cursor)
+        # The first conjunct is a plain range predicate the index can seek on
+        conditions.append("p.created_at <= $after_ts")
+        conditions.append("(p.created_at < $after_ts OR p.id < $after_id)")
+        params.update(after_ts=after_ts, after_id=after_id)
+
+    if user_id:
+        match = "MATCH (u:User {id: $uid})-[:AUTHORED]->(p:Post)"
+        params["uid"] = user_id
+    else:
+        match = "MATCH (p:Post)<-[:AUTHORED]-(u:User)"
+
     with db.get_session() as session:
-        if user_id:
-            results = session.run(
-                """
-                MATCH (u:User {id: $uid})-[:AUTHORED]->(p:Post)
-                OPTIONAL MATCH (p)<-[:LIKED]-(l:User)
-                OPTIONAL MATCH (c:Comment)-[:ON_POST]->(p)
-                RETURN p, u,
-                       count(DISTINCT l) as likes_count,
-                       count(DISTINCT c) as comments_count
-                ORDER BY p.created_at DESC
-                """,
-                uid=user_id,
-            )
-        else:
-            results = session.run(
-                """
-                MATCH (u:User)-[:AUTHORED]->(p:Post)
-                OPTIONAL MATCH (p)<-[:LIKED]-(l:User)
-                OPTIONAL MATCH (c:Comment)-[:ON_POST]->(p)
-                RETURN p, u,
-                       count(DISTINCT l) as likes_count,
-                       count(DISTINCT c) as comments_count
-                ORDER BY p.created_at DESC
-                """
-            )
+        results = session.run(
+            f"""
+            {match}
+            WHERE {" AND ".join(conditions)}
+            RETURN p, u
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT $limit
+            """,
+            **params,
+        )
+        posts = [_post_from_record(record, for_list=True) for record in results]
 
-        posts = []
-        for record in results:
-            p = dict(record["p"])
-            u = dict(record["u"])
-            p["user"] = u
-            p["likes_count"] = record["likes_count"]
-            p["comments_count"] = record["comments_count"]
-            posts.append(p)
-        return posts
+    page, next_cursor = paginate(posts, limit, lambda p: (p.get("created_at"), p.get("id")))
+    set_next_cursor(response, next_cursor)
+    return page
 
 
-@router.get("/{post_id}")
-def get_post(post_id: str):
+def _load_post(post_id: str) -> dict:
     with db.get_session() as session:
         rec = session.run(
-            """
-            MATCH (u:User)-[:AUTHORED]->(p:Post {id: $id})
-            OPTIONAL MATCH (p)<-[:LIKED]-(l:User)
-            OPTIONAL MATCH (c:Comment)-[:ON_POST]->(p)
-            RETURN p, u,
-                   count(DISTINCT l) as likes_count,
-                   count(DISTINCT c) as comments_count
-            """,
+            "MATCH (u:User)-[:AUTHORED]->(p:Post {id: $id}) RETURN p, u",
             id=post_id,
         ).single()
 
         if not rec:
             raise HTTPException(status_code=404, detail="Post not found")
 
-        p = dict(rec["p"])
-        p["user"] = dict(rec["u"])
-        p["likes_count"] = rec["likes_count"]
-        p["comments_count"] = rec["comments_count"]
-        return p
+        return _post_from_record(rec)
+
+
+@router.get("/{post_id}")
+def get_post(post_id: str, request: Request):
+    return cached_json(request, post_tag(post_id), lambda _: _load_post(post_id))
 
 
 @router.delete("/{post_id}")
@@ -260,29 +311,51 @@ def delete_post(post_id: str, current_user: dict = Depends(get_current_user)):
             raise HTTPException(status_code=403, detail="Not authorized")
 
         session.run("MATCH (p:Post {id: $id}) DETACH DELETE p", id=post_id)
+    invalidate(post_tag(post_id))
 
     return {"detail": "Post deleted"}
 
 
 @router.post("/{post_id}/like")
 def like_post(post_id: str, current_user: dict = Depends(get_current_user)):
+    # The counter only moves when MERGE actually creates the LIKED edge
     with db.get_session() as session:
-        exists = session.run("MATCH (p:Post {id: $id}) RETURN p", id=post_id).single()
-        if not exists:
-            raise HTTPException(status_code=404, detail="Post not found")
-
-        session.run(
+        rec = session.run(
             """
-            MATCH (u:User {id: $uid}), (p:Post {id: $pid})
+            MATCH (p:Post {id: $pid})
+            MATCH (u:User {id: $uid})
             MERGE (u)-[:LIKED]->(p)
+            ON CREATE SET p.likes_count = coalesce(p.likes_count, 0) + 1
+            RETURN coalesce(p.likes_count, 0) as likes
             """,
             uid=current_user["id"],
             pid=post_id,
-        )
+        ).single()
+
+    if not rec:
+        raise HTTPException(status_code=404, detail="Post not found")
+    invalidate(post_tag(post_id))
+    return {"post_id": post_id, "likes": rec["likes"]}
+
 
-        count_rec = session.run(
-            "MATCH (:User)-[:LIKED]->(p:Post {id: $pid}) RETURN count(*) as likes",
+@router.post("/{post_id}/unlike")
+def unlike_post(post_id: str, current_user: dict = Depends(get_current_user)):
+    with db.get_session() as session:
+        rec = session.run(
+            """
+            MATCH (p:Post {id: $pid})
+            OPTIONAL MATCH (:User {id: $uid})-[r:LIKED]->(p)
+            FOREACH (_ IN CASE WHEN r IS NULL THEN [] ELSE [1] END |
+                DELETE r
+                SET p.likes_count = CASE WHEN coalesce(p.likes_count, 0) > 0 THEN p.likes_count - 1 ELSE 0 END
+            )
+            RETURN coalesce(p.likes_count, 0) as likes
+            """,
+            uid=current_user["id"],
             pid=post_id,
         ).single()
 
-        return {"post_id": post_id, "likes": count_rec["likes"]}
\ No newline at end of file
+    if not rec:
+        raise HTTPException(status_code=404, detail="Post not found")
+    invalidate(post_tag(post_id))
+    return {"post_id": post_id, "likes": rec["likes"]}
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, Form, File
-from app.core.database import db
-from app.core.security import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, Form, File, Query, Request, Response
+from app.core.counters import REPOINT_LAST_MESSAGE_CYPHER
+from app.core.database import db, async_db
+from app.core.images import schedule_avatar_variants
+from app.core.pagination import decode_cursor, paginate, set_next_cursor
+from app.core.response_cache import cached_json, invalidate, user_tag
+from app.core.timeline import get_timeline_backend
+from app.core.security import get_current_user, invalidate_cached_user
+from app.core.typeahead import username_index
+from app.core.uploads import save_upload
 from app.schemas.user_schema import UserUpdate
-import os
-from uuid import uuid4
-from shutil import copyfileobj
+from neo4j.exceptions import ClientError, ConstraintError
+import logging
+import re
+from datetime import datetime
 
-router = APIRouter(prefix="/users", tags=["Users"])
+logger = logging.getLogger(__name__)
 
-UPLOADS_DIR = os.path.join(os.getcwd(), "uploads")
-os.makedirs(UPLOADS_DIR, exist_ok=True)
+router = APIRouter(prefix="/users", tags=["Users"])
 
 BASE_URL = "http://127.0.0.1:8000"
 
@@ -30,46 +37,56 @@ def _is_admin(user: dict | None) -> bool:
     return role in {"admin", "superadmin"}
 
 @router.get("/")
-def list_users(me: str | None = None):
-    """Return a list of users with counts and is_following relative to optional me.
+def list_users(
+    response: Response,
+    me: str | None = None,
+    limit: int = Query(100, ge=1, le=500, description="Users per page"),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+):
+    """Directory of users ordered by username, with stored follow counters and
+    is_following relative to optional me (checked only for the returned page).
     profile_pic is a full URL.
     """
+    params = {"me": me, "limit": limit + 1}
+    conditions = ["u.username IS NOT NULL"]
+    if cursor:
+        after_name, after_id = decode_cursor(cursor)
+        conditions.append("u.username >= $after_name")
+        conditions.append("(u.username > $after_name OR u.id > $after_id)")
+        params.update(after_name=after_name, after_id=after_id)
+
     with db.get_session() as session:
         results = session.run(
-            """
+            f"""
             MATCH (u:User)
-            OPTIONAL MATCH (u)<-[:FOLLOWS]-(f)
-            WITH u, count(f) AS followers_count
-            OPTIONAL MATCH (u)-[:FOLLOWS]->(g)
-            WITH u, followers_count, count(g) AS following_count
-            RETURN u, followers_count, following_count
-            LIMIT 500
-            """
+            WHERE {" AND ".join(conditions)}
+            WITH u ORDER BY u.username, u.id LIMIT $limit
+            RETURN u.id AS id, u.username AS username, u.bio AS bio,
+                   coalesce(u.avatar_small_url, u.avatar_url) AS avatar_url,
+                   coalesce(u.followers_count, 0) AS followers_count,
+                   coalesce(u.following_count, 0) AS following_count,
+                   size([(:User {{id: $me}})-[:FOLLOWS]->(u) | 1]) > 0 AS is_following
+            ORDER BY u.username, u.id
+            """,
+            **params,
         )
-        # Pre-compute following set for 'me' if provided
-        my_following: set[str] = set()
-        if me:
-            q = session.run(
-                "MATCH (:User {id: $me})-[:FOLLOWS]->(x:User) RETURN x.id AS id",
-                me=me,
-            )
-            my_following = {rec["id"] for rec in q}
-
-        out = []
-        for r in results:
-            u = dict(r["u"])
-            u.pop("password", None)
-            out.append({
-                "id": u.get("id"),
-                "username": u.get("username"),
-                "bio": u.get("bio"),
-                "followers_count": r["followers_count"] or 0,
-                "following_count": r["following_count"] or 0,
-                "is_following": (u.get("id") in my_following) if me else False,
+        out = [
+            {
+                "id": r["id"],
+                "username": r["username"],
+                "bio": r["bio"],
+                "followers_count": r["followers_count"],
+                "following_count": r["following_count"],
+                "is_following": r["is_following"],
                 # Return FULL URL per requirement
-                "profile_pic": _full_profile_pic(u.get("avatar_url")),
-            })
-        return out
+                "profile_pic": _full_profile_pic(r["avatar_url"]),
+            }
+            for r in results
+        ]
+
+    page, next_cursor = paginate(out, limit, lambda u: (u["username"], u["id"]))
+    set_next_cursor(response, next_cursor)
+    return page
 
 
 @router.delete("/{user_id}")
@@ -98,6 +115,15 @@ def delete_user_admin(user_id: str, current_user: dict = Depends(get_current_use
         ).single()
         deleted_messages = int(count_rec["cnt"] or 0) if count_rec else 0
 
+        # Conversations whose last message is about to disappear
+        affected = session.run(
+            """
+            MATCH (:User {id:$uid})-[:SENT]->(:Message)<-[:LAST_MESSAGE]-(c:Conversation)
+            RETURN collect(c.id) as cids
+            """,
+            uid=user_id,
+        ).single()
+
         # Delete messages sent by user
         session.run(
             """
@@ -107,8 +133,36 @@ def delete_user_admin(user_id: str, current_user: dict = Depends(get_current_use
             uid=user_id,
         )
 
-        # Delete the user node and all its relationships
-        session.run("MATCH (u:User {id:$id}) DETACH DELETE u", id=user_id)
+        # Delete the user node and all its relationships, releasing the
+        # follow counters held on the other end of each FOLLOWS edge
+        follows = session.run(
+            """
+            MATCH (u:User {id:$id})
+            CALL {
+                WITH u
+                MATCH (u)-[:FOLLOWS]->(f:User)
+                SET f.followers_count = CASE WHEN coalesce(f.followers_count, 0) > 0 THEN f.followers_count - 1 ELSE 0 END
+                RETURN collect(f.id) AS followees
+            }
+            CALL {
+                WITH u
+                MATCH (g:User)-[:FOLLOWS]->(u)
+                SET g.following_count = CASE WHEN coalesce(g.following_count, 0) > 0 THEN g.following_count - 1 ELSE 0 END
+                RETURN collect(g.id) AS followers
+            }
+            DETACH DELETE u
+            RETURN followees, followers
+            """,
+            id=user_id,
+        ).single()
+        followees = (follows and follows["followees"]) or []
+        followers = (follows and follows["followers"]) or []
+        invalidate_cached_user(user_id=user_id)
+        username_index.remove(user_id)
+        # Their counters and follower/following lists changed too
+        invalidate(user_tag(user_id), *(user_tag(uid) for uid in set(followees) | set(followers)))
+        for uid in followers:
+            get_timeline_backend().drop(uid)
 
         # Prune empty conversations
         session.run(
@@ -118,6 +172,8 @@ def delete_user_admin(user_id: str, current_user: dict = Depends(get_current_use
             DETACH DELETE c
             """
         )
+        if affected and affected["cids"]:
+            session.run(REPOINT_LAST_MESSAGE_CYPHER, cids=affected["cids"])
 
     return {"success": True, "deleted_user": user_id, "deleted_messages": deleted_messages}
 
@@ -166,30 +222,42 @@ async def update_me(
     # Choose whichever field was provided
     upload = avatar or file
     if upload is not None:
-        ext = os.path.splitext(upload.filename)[1] or ".jpg"
-        filename = f"{uuid4()}{ext}"
-        file_path = os.path.join(UPLOADS_DIR, filename)
-        with open(file_path, "wb") as f:
-            copyfileobj(upload.file, f)
+        filename = await save_upload(upload)
         updates["avatar_url"] = f"/uploads/{filename}"
 
     if not updates:
         return current_user
 
-    with db.get_session() as session:
-        session.run(
-            "MATCH (u:User {id: $id}) SET u += $updates RETURN u",
+    # A replaced avatar invalidates its derivatives
+    try:
+        rec = await async_db.run_single(
+            """
+            MATCH (u:User {id: $id})
+            WITH u, 'avatar_url' IN keys($updates)
+                    AND coalesce(u.avatar_url, '') <> coalesce($updates.avatar_url, '') AS replaced
+            SET u.avatar_small_url = CASE WHEN replaced THEN null ELSE u.avatar_small_url END,
+                u.avatar_medium_url = CASE WHEN replaced THEN null ELSE u.avatar_medium_url END
+            SET u += $updates
+            RETURN u
+            """,
             id=current_user["id"],
             updates=updates,
         )
-        rec = session.run("MATCH (u:User {id: $id}) RETURN u", id=current_user["id"]).single()
-        if not rec:
-            raise HTTPException(status_code=404, detail="User not found")
-        u = dict(rec["u"])
-        u.pop("password", None)
-        # Return full URL for profile_pic
-        u["profile_pic"] = _full_profile_pic(u.get("avatar_url"))
-        return u
+    except ConstraintError:
+        # user_username_unique: another account already has this username
+        raise HTTPException(status_code=400, detail="Username already taken")
+    invalidate_cached_user(user_id=current_user["id"])
+    if not rec:
+        raise HTTPException(status_code=404, detail="User not found")
+    u = dict(rec["u"])
+    u.pop("password", None)
+    username_index.upsert(u)
+    invalidate(user_tag(current_user["id"]))
+    if upload is not None:
+        schedule_avatar_variants(current_user["id"], filename, updates["avatar_url"])
+    # Return full URL for profile_pic
+    u["profile_pic"] = _full_profile_pic(u.get("avatar_url"))
+    return u
 
 @router.put("/{user_id}")
 async def update_user_by_id(
@@ -210,76 +278,112 @@ async def update_user_by_id(
     return await update_me(username=username, bio=bio, avatar=avatar, current_user=current_user, file=file)
 
 @router.get("/{user_id}")
-def get_user_by_id(user_id: str, me: str | None = None):
-    with db.get_session() as session:
-        rec = session.run("MATCH (u:User {id: $id}) RETURN u", id=user_id).single()
-        if not rec:
-            raise HTTPException(status_code=404, detail="User not found")
-        u = dict(rec["u"])
-        u.pop("password", None)
+def get_user_by_id(user_id: str, request: Request, me: str | None = None):
+    return cached_json(request, user_tag(user_id), lambda _: _load_profile(user_id, me))
+
 
-        # Counts
-        counts = session.run(
+def _load_profile(user_id: str, me: str | None) -> dict:
+    """Public profile in one query: stored follow counters, is_following
+    relative to optional me, and pinned posts.
+    """
+    with db.get_session() as session:
+        rec = session.run(
             """
             MATCH (u:User {id: $id})
-            OPTIONAL MATCH (u)<-[:FOLLOWS]-(f)
-            WITH u, count(f) AS followers_count
-            OPTIONAL MATCH (u)-[:FOLLOWS]->(g)
-            RETURN followers_count, count(g) AS following_count
+            RETURN u.id AS id, u.username AS username, u.bio AS bio,
+                   coalesce(u.avatar_medium_url, u.avatar_url) AS avatar_url,
+                   coalesce(u.followers_count, 0) AS followers_count,
+                   coalesce(u.following_count, 0) AS following_count,
+                   size([(:User {id: $me})-[:FOLLOWS]->(u) | 1]) > 0 AS is_following,
+                   [(u)-[:PINNED]->(p:Post) | p] AS pinned_posts
             """,
             id=user_id,
+            me=me,
         ).single()
-        followers_count = counts["followers_count"] or 0
-        following_count = counts["following_count"] or 0
-
-        # is_following relative to me
-        following_bool = False
-        if me:
-            chk = session.run(
-                "MATCH (:User {id: $me})-[:FOLLOWS]->(:User {id: $id}) RETURN 1 AS ok",
-                me=me,
-                id=user_id,
-            ).single()
-            following_bool = bool(chk)
-
-        # Include pinned posts
-        pinned = session.run(
-            "MATCH (u:User {id: $id})-[:PINNED]->(p:Post) RETURN p", id=user_id
-        )
-        result = {
-            "id": u.get("id"),
-            "username": u.get("username"),
-            "bio": u.get("bio"),
-            "followers_count": followers_count,
-            "following_count": following_count,
-            "is_following": following_bool,
-            "profile_pic": _full_profile_pic(u.get("avatar_url")),
-            "pinned_posts": [dict(r["p"]) for r in pinned],
-        }
-        return result
+    if not rec:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {
+        "id": rec["id"],
+        "username": rec["username"],
+        "bio": rec["bio"],
+        "followers_count": rec["followers_count"],
+        "following_count": rec["following_count"],
+        "is_following": rec["is_following"],
+        "profile_pic": _full_profile_pic(rec["avatar_url"]),
+        "pinned_posts": [dict(p) for p in rec["pinned_posts"]],
+    }
 
 
 @router.post("/{user_id}/follow")
 def follow_user(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Idempotent: `changed` is true only when this call created the edge."""
+    now = datetime.utcnow().isoformat() + "Z"
     with db.get_session() as session:
-        session.run(
-            "MATCH (me:User {id: $me}), (u:User {id: $uid}) MERGE (me)-[:FOLLOWS]->(u)",
-            me=current_user["id"], uid=user_id
-        )
-    return {"detail": "Followed"}
+        # Counters move only when MERGE actually creates the edge. `changed`
+        # comes from a marker set in ON CREATE rather than a check before the
+        # MERGE, which a concurrent follow could make stale.
+        rec = session.run(
+            """
+            MATCH (me:User {id: $me}), (u:User {id: $uid})
+            MERGE (me)-[r:FOLLOWS]->(u)
+            ON CREATE SET r.since = $now,
+                          r._created = true,
+                          me.following_count = coalesce(me.following_count, 0) + 1,
+                          u.followers_count = coalesce(u.followers_count, 0) + 1
+            WITH u, r, coalesce(r._created, false) AS changed
+            REMOVE r._created
+            RETURN changed, coalesce(u.followers_count, 0) AS followers_count
+            """,
+            me=current_user["id"], uid=user_id, now=now,
+        ).single()
+    if not rec:
+        raise HTTPException(status_code=404, detail="User not found")
+    if rec["changed"]:
+        # Followed set changed: rebuild the home timeline on next read
+        get_timeline_backend().drop(current_user["id"])
+        invalidate(user_tag(current_user["id"]), user_tag(user_id))
+    return {
+        "detail": "Followed" if rec["changed"] else "Already following",
+        "changed": rec["changed"],
+        "followers_count": rec["followers_count"] or 0,
+    }
 
 
 @router.post("/{user_id}/unfollow")
 def unfollow_user(user_id: str, current_user: dict = Depends(get_current_user)):
+    """Idempotent: `changed` is true only when this call deleted the edge."""
     with db.get_session() as session:
-        session.run(
-            "MATCH (me:User {id: $me})-[r:FOLLOWS]->(u:User {id: $uid}) DELETE r",
+        rec = session.run(
+            """
+            MATCH (me:User {id: $me}), (u:User {id: $uid})
+            OPTIONAL MATCH (me)-[r:FOLLOWS]->(u)
+            WITH me, u, r, r IS NOT NULL AS changed
+            FOREACH (_ IN CASE WHEN changed THEN [1] ELSE [] END |
+                DELETE r
+                SET me.following_count = CASE WHEN coalesce(me.following_count, 0) > 0 THEN me.following_count - 1 ELSE 0 END,
+                    u.followers_count = CASE WHEN coalesce(u.followers_count, 0) > 0 THEN u.followers_count - 1 ELSE 0 END
+            )
+            RETURN changed, coalesce(u.followers_count, 0) AS followers_count
+            """,
             me=current_user["id"], uid=user_id
-        )
-    return {"detail": "Unfollowed"}
+        ).single()
+    if not rec:
+        raise HTTPException(status_code=404, detail="User not found")
+    if rec["changed"]:
+        get_timeline_backend().drop(current_user["id"])
+        invalidate(user_tag(current_user["id"]), user_tag(user_id))
+    return {
+        "detail": "Unfollowed" if rec["changed"] else "Not following",
+        "changed": rec["changed"],
+        "followers_count": rec["followers_count"],
+    }
 
 @router.get("/{user_id}/followers")
-def list_followers(user_id: str):
+def list_followers(user_id: str, request: Request):
+    return cached_json(request, user_tag(user_id), lambda _: _load_followers(user_id))
+
+
+def _load_followers(user_id: str) -> list:
     with db.get_session() as session:
         recs = session.run(
             "MATCH (:User {id: $id})<-[:FOLLOWS]-(f:User) RETURN f",
@@ -293,12 +397,16 @@ def list_followers(user_id: str):
                 "id": u.get("id"),
                 "username": u.get("username"),
                 "bio": u.get("bio"),
-                "profile_pic": _full_profile_pic(u.get("avatar_url")),
+                "profile_pic": _full_profile_pic(u.get("avatar_small_url") or u.get("avatar_url")),
             })
         return out
 
 @router.get("/{user_id}/following")
-def list_following(user_id: str):
+def list_following(user_id: str, request: Request):
+    return cached_json(request, user_tag(user_id), lambda _: _load_following(user_id))
+
+
+def _load_following(user_id: str) -> list:
     with db.get_session() as session:
         recs = session.run(
             "MATCH (:User {id: $id})-[:FOLLOWS]->(f:User) RETURN f",
@@ -312,44 +420,179 @@ def list_following(user_id: str):
                 "id": u.get("id"),
                 "username": u.get("username"),
                 "bio": u.get("bio"),
-                "profile_pic": _full_profile_pic(u.get("avatar_url")),
+                "profile_pic": _full_profile_pic(u.get("avatar_small_url") or u.get("avatar_url")),
             })
         return out
 
 
+def _rebuild_timeline(session, user_id: str) -> None:
+    """Seed a cold timeline from the graph (bounded by TIMELINE_MAX_LENGTH)."""
+    backend = get_timeline_backend()
+    results = session.run(
+        """
+        MATCH (me:User {id: $me})-[:FOLLOWS]->(u:User)-[:AUTHORED]->(p:Post)
+        WHERE NOT coalesce(u.fanout_on_read, false) AND p.created_at IS NOT NULL
+        RETURN p.created_at AS created_at, p.id AS id
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT $max
+        """,
+        me=user_id,
+        max=backend.max_length,
+    )
+    backend.replace(user_id, [(r["created_at"], r["id"]) for r in results])
+
+
 @router.get("/me/feed")
-def get_my_feed(current_user: dict = Depends(get_current_user)):
+def get_my_feed(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Posts per page"),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    current_user: dict = Depends(get_current_user),
+):
+    """Home feed served from the caller's precomputed timeline, merged with
+    posts pulled at read time from followed fan-out-on-read (high-follower) accounts.
+    """
+    me = current_user["id"]
+    backend = get_timeline_backend()
+    before = tuple(decode_cursor(cursor)) if cursor else None
+
     with db.get_session() as session:
-        results = session.run(
+        if not backend.is_warm(me):
+            _rebuild_timeline(session, me)
+        entries = backend.page(me, before, limit + 1)
+
+        pulled = session.run(
             """
-            MATCH (me:User {id: $me})-[:FOLLOWS]->(u:User)-[:AUTHORED]->(p:Post)
-            RETURN p ORDER BY p.created_at DESC
+            MATCH (me:User {id: $me})-[:FOLLOWS]->(u:User {fanout_on_read: true})-[:AUTHORED]->(p:Post)
+            WHERE p.created_at IS NOT NULL
+              AND ($before_ts IS NULL OR p.created_at < $before_ts
+                   OR (p.created_at = $before_ts AND p.id < $before_id))
+            RETURN p.created_at AS created_at, p.id AS id
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT $limit
             """,
-            me=current_user["id"]
+            me=me,
+            before_ts=before[0] if before else None,
+            before_id=before[1] if before else None,
+            limit=limit + 1,
         )
-        posts = [dict(r["p"]) for r in results]
+        entries = sorted(set(entries) | {(r["created_at"], r["id"]) for r in pulled}, reverse=True)
+        entries, next_cursor = paginate(entries, limit, lambda e: e)
+
+        ids = [post_id for _, post_id in entries]
+        results = session.run("MATCH (p:Post) WHERE p.id IN $ids RETURN p", ids=ids)
+        by_id = {r["p"]["id"]: dict(r["p"]) for r in results}
+        # Deleted posts simply drop out of the page
+        posts = [by_id[post_id] for post_id in ids if post_id in by_id]
+
         # Include pinned posts
         pinned = session.run(
-            "MATCH (me:User {id: $me})-[:PINNED]->(p:Post) RETURN p", me=current_user["id"]
+            "MATCH (me:User {id: $me})-[:PINNED]->(p:Post) RETURN p", me=me
         )
         pinned_posts = [dict(r["p"]) for r in pinned]
-        return {"posts": posts, "pinned_posts": pinned_posts}
+    set_next_cursor(response, next_cursor)
+    return {"posts": posts, "pinned_posts": pinned_posts}
+
+
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def _lucene_terms(query: str) -> list[str]:
+    """Split user input into Lucene-escaped terms. Lower-casing matches the
+    index analyzer and keeps a typed AND/OR/NOT from acting as an operator.
+    """
+    return [_LUCENE_SPECIAL.sub(r"\\\1", t.lower()) for t in query.split() if t]
+
+
+# Label scan, so only for when the user_search index is missing: every term
+# of the username (prefix mode) or any term of username or bio (fulltext
+# mode) as a case-insensitive substring
+_SEARCH_WITHOUT_INDEX_CYPHER = """
+MATCH (u:User)
+WITH u, toLower(coalesce(u.username, '')) AS username, toLower(coalesce(u.bio, '')) AS bio
+WITH u, username, bio,
+     [t IN $terms WHERE username CONTAINS t] AS in_username,
+     [t IN $terms WHERE $with_bio AND bio CONTAINS t] AS in_bio
+WHERE CASE WHEN $all_terms
+           THEN all(t IN $terms WHERE t IN in_username OR t IN in_bio)
+           ELSE size(in_username) + size(in_bio) > 0 END
+WITH u, 3.0 * size(in_username) + size(in_bio)
+        + CASE WHEN username STARTS WITH $terms[0] THEN 1.0 ELSE 0.0 END AS score
+RETURN u.id AS id, u.username AS username, u.name AS name,
+       u.bio AS bio, coalesce(u.avatar_small_url, u.avatar_url) AS avatar_url, score
+ORDER BY score DESC, username
+LIMIT $limit
+"""
+
+
+def _search_users_without_index(session, query: str, limit: int, mode: str) -> list:
+    terms = [t.lower() for t in query.split() if t]
+    return list(session.run(
+        _SEARCH_WITHOUT_INDEX_CYPHER,
+        terms=terms,
+        all_terms=mode == "prefix",
+        with_bio=mode != "prefix",
+        limit=limit,
+    ))
 
 
 @router.get("/search/{query}")
-def search_users(query: str):
+def search_users(
+    query: str,
+    limit: int = Query(20, ge=1, le=50, description="Max users to return"),
+    mode: str = Query("fulltext", pattern="^(fulltext|prefix)$", description="'prefix' for typeahead"),
+):
+    """Ranked user search over username and bio via the `user_search` full-text index.
+    `prefix` mode (typeahead) matches every term as a username prefix only, the
+    same field the in-memory username index covers, so a single-term typeahead
+    answered from that index once it is warm finds the same users. Until
+    migration 5 has created the index, a bounded substring scan answers
+    instead. Email is neither searched nor returned.
+    """
+    terms = _lucene_terms(query)
+    if not terms:
+        return []
+    if mode == "prefix" and len(query.split()) == 1 and username_index.ready:
+        return [
+            {
+                "id": u["id"],
+                "username": u["username"],
+                "name": u["name"],
+                "bio": u["bio"],
+                "profile_pic": _full_profile_pic(u["avatar_small_url"] or u["avatar_url"]),
+                "score": u["score"],
+            }
+            for u in username_index.search(query, limit)
+        ]
+    if mode == "prefix":
+        lucene = " AND ".join(f"username:{t}*" for t in terms)
+    else:
+        lucene = " ".join(f"(username:{t}^3 OR bio:{t})" for t in terms)
+
     with db.get_session() as session:
-        results = session.run(
-            """
-            MATCH (u:User)
-            WHERE toLower(u.username) CONTAINS toLower($q) OR toLower(u.email) CONTAINS toLower($q)
-            RETURN u LIMIT 50
-            """,
-            q=query
-        )
-        out = []
-        for r in results:
-            u = dict(r["u"])
-            u.pop("password", None)
-            out.append(u)
-        return out
+        try:
+            results = list(session.run(
+                """
+                CALL db.index.fulltext.queryNodes('user_search', $q) YIELD node, score
+                RETURN node.id AS id, node.username AS username, node.name AS name,
+                       node.bio AS bio, coalesce(node.avatar_small_url, node.avatar_url) AS avatar_url, score
+                LIMIT $limit
+                """,
+                q=lucene,
+                limit=limit,
+            ))
+        except ClientError as e:
+            # The index comes from migration 5, which may not have run (yet)
+            logger.warning(f"user_search full-text query failed, using substring search: {e}")
+            results = _search_users_without_index(session, query, limit, mode)
+        return [
+            {
+                "id": r["id"],
+                "username": r["username"],
+                "name": r["name"],
+                "bio": r["bio"],
+                "profile_pic": _full_profile_pic(r["avatar_url"]),
+                "score": r["score"],
+            }
+            for r in results
+        ]
@@ -1,8 +1,22 @@
+import asyncio
+import logging
+from urllib.parse import parse_qs
+
 import socketio
 
-# Socket.IO Async server with permissive CORS for local dev
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_db
+from app.core.security import decode_access_token, get_user_by_subject
+from app.core.socket_manager import create_client_manager
+
+logger = logging.getLogger(__name__)
+
+# Socket.IO Async server with permissive CORS for local dev. The client
+# manager comes from SOCKETIO_MESSAGE_QUEUE so room emits reach every worker.
 sio = socketio.AsyncServer(
     async_mode="asgi",
+    client_manager=create_client_manager(),
     cors_allowed_origins=["http://localhost:5173", "http://127.0.0.1:5173", "*"],
 )
 
@@ -12,20 +26,91 @@ sio = socketio.AsyncServer(
 # preventing "Expected ASGI message 'websocket.accept'..." errors.
 socket_app = socketio.ASGIApp(sio, socketio_path="")
 
-# Optional: room helpers to scope messages by conversation id
+# Positive (conversation_id, user_id) membership checks only, so a brand-new
+# conversation can be joined at once; membership is never revoked in place
+membership_cache = TTLCache(
+    maxsize=settings.SOCKET_MEMBERSHIP_CACHE_SIZE,
+    ttl=settings.SOCKET_MEMBERSHIP_CACHE_TTL_SECONDS,
+)
+
+
+def user_room(user_id: str) -> str:
+    """Room every connection of a user joins; target it for inbox events."""
+    return f"user:{user_id}"
+
+
+async def emit_to_user(user_id: str, event: str, data: dict) -> None:
+    """Best-effort emit to all of a user's connections (any worker)."""
+    try:
+        await sio.emit(event, data, room=user_room(user_id))
+    except Exception as e:
+        logger.warning(f"Socket emit {event} to user {user_id} failed: {e}")
+
+
+def _token_from(environ: dict, auth) -> str | None:
+    # socket.io-client `auth: { token }`, then ?token=..., then a Bearer header
+    if isinstance(auth, dict) and auth.get("token"):
+        return str(auth["token"])
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    if query.get("token"):
+        return query["token"][0]
+    header = environ.get("HTTP_AUTHORIZATION", "")
+    if header.lower().startswith("bearer "):
+        return header[7:].strip()
+    return None
+
+
+async def _is_participant(user_id: str, cid: str) -> bool:
+    if membership_cache.get((cid, user_id)):
+        return True
+    rec = await async_db.run_single(
+        "RETURN size([(:User {id: $uid})-[:PARTICIPATES_IN]->(:Conversation {id: $cid}) | 1]) > 0 AS ok",
+        uid=user_id,
+        cid=cid,
+    )
+    allowed = bool(rec and rec["ok"])
+    if allowed:
+        membership_cache.set((cid, user_id), True)
+    return allowed
+
+
 @sio.event
-async def connect(sid, environ):
-    pass
+async def connect(sid, environ, auth=None):
+    """Accept only clients presenting a valid access token (same checks as
+    HTTP routes) and put each one in its user room.
+    """
+    token = _token_from(environ, auth)
+    subject = decode_access_token(token) if token else None
+    user = await asyncio.to_thread(get_user_by_subject, subject) if subject else None
+    if not user:
+        raise socketio.exceptions.ConnectionRefusedError("unauthorized")
+    user_id = str(user["id"])
+    await sio.save_session(sid, {"user_id": user_id})
+    await sio.enter_room(sid, user_room(user_id))
+
 
 @sio.event
 async def disconnect(sid):
     pass
 
+
 @sio.event
 async def join_conversation(sid, data):
-    cid = str(data.get("conversation_id")) if isinstance(data, dict) else None
-    if cid:
-        await sio.enter_room(sid, cid)
+    """Join a conversation room; only its participants may. Acks {ok, error?}."""
+    cid = str(data.get("conversation_id")) if isinstance(data, dict) and data.get("conversation_id") else None
+    if not cid:
+        return {"ok": False, "error": "conversation_id required"}
+    session = await sio.get_session(sid)
+    try:
+        allowed = await _is_participant(session["user_id"], cid)
+    except Exception as e:
+        logger.warning(f"Membership check failed for {cid}: {e}")
+        return {"ok": False, "error": "unavailable"}
+    if not allowed:
+        return {"ok": False, "error": "forbidden"}
+    await sio.enter_room(sid, cid)
+    return {"ok": True}
+
 
 @sio.event
 async def leave_conversation(sid, data):
@@ -0,0 +1,127 @@
+"""Fan-out latency of /ws/chat: RoomHub vs. the old sequential broadcast.
+
+Simulates N connections in one room with in-process sockets whose send_text
+yields to the loop once (fast clients) or sleeps --slow-delay seconds (the
+--slow fraction of clients). For each published message it measures the time
+until every fast client has received it. The "sequential" baseline awaits
+each send_text in turn, like the ConnectionManager this hub replaced. No
+database or server is needed. Run from socapp/backend:
+
+    python -m benchmarks.chat_fanout --connections 1000 10000
+    python -m benchmarks.chat_fanout --connections 1000 --slow 0.01 --slow-delay 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.room_hub import RoomHub
+
+ROOM = "lobby"
+
+
+class _Delivery:
+    def __init__(self, fast: int):
+        self.fast = fast
+        self.started = {}
+        self.received = {}
+        self.done = {}
+        self.deliveries = []
+
+    def begin(self, i: int) -> asyncio.Event:
+        self.started[i] = time.perf_counter()
+        self.received[i] = 0
+        self.done[i] = asyncio.Event()
+        return self.done[i]
+
+    def record(self, i: int) -> None:
+        self.deliveries.append((time.perf_counter() - self.started[i]) * 1000)
+        self.received[i] += 1
+        if self.received[i] == self.fast:
+            self.done[i].set()
+
+
+class _FakeSocket:
+    def __init__(self, delivery: _Delivery, delay: float):
+        self.delivery = delivery
+        self.delay = delay
+
+    async def send_text(self, message: str) -> None:
+        await asyncio.sleep(self.delay)
+        if not self.delay:
+            self.delivery.record(int(message))
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _sockets(args, n: int, delivery: _Delivery):
+    slow = int(n * args.slow)
+    return [_FakeSocket(delivery, args.slow_delay if i < slow else 0) for i in range(n)]
+
+
+def _percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)]
+
+
+async def _run_hub(args, n: int):
+    delivery = _Delivery(n - int(n * args.slow))
+    hub = RoomHub(shards=args.shards, queue_size=args.queue_size,
+                  send_timeout=args.send_timeout, policy=args.policy)
+    conns = [hub.connect(s, rooms=[ROOM]) for s in _sockets(args, n, delivery)]
+    latencies = []
+    for i in range(args.messages):
+        done = delivery.begin(i)
+        await hub.publish(ROOM, str(i))
+        await done.wait()
+        latencies.append((time.perf_counter() - delivery.started[i]) * 1000)
+    evicted = hub.evicted
+    for conn in conns:
+        hub.disconnect(conn)
+    await asyncio.gather(*(conn.writer for conn in conns), return_exceptions=True)
+    return latencies, delivery.deliveries, evicted
+
+
+async def _run_sequential(args, n: int):
+    delivery = _Delivery(n - int(n * args.slow))
+    sockets = _sockets(args, n, delivery)
+    latencies = []
+    for i in range(args.messages):
+        delivery.begin(i)
+        for socket in sockets:
+            await socket.send_text(str(i))
+        latencies.append((time.perf_counter() - delivery.started[i]) * 1000)
+    return latencies, delivery.deliveries, 0
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--slow", type=float, default=0.0, help="fraction of slow clients")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="seconds per send for slow clients")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--send-timeout", type=float, default=5.0)
+    parser.add_argument("--policy", default="evict", choices=["evict", "drop_oldest"])
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    runners = [("hub", _run_hub)]
+    if not args.skip_sequential:
+        runners.append(("sequential", _run_sequential))
+    for n in args.connections:
+        for name, run in runners:
+            latencies, deliveries, evicted = await run(args, n)
+            print(f"{name} @ {n} connections ({args.messages} messages, {args.slow:.1%} slow)")
+            print(f"  all-delivered p50:  {statistics.median(latencies):.2f} ms")
+            print(f"  all-delivered p95:  {_percentile(latencies, 0.95):.2f} ms")
+            print(f"  per-client p50:     {statistics.median(deliveries):.2f} ms")
+            print(f"  per-client p99:     {_percentile(deliveries, 0.99):.2f} ms")
+            if name == "hub":
+                print(f"  evicted:            {evicted}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
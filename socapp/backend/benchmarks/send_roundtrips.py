@@ -0,0 +1,126 @@
+"""Round-trips and latency per POST /messages/send.
+
+Calls the route coroutine directly and counts every statement the shared
+async driver sends to Neo4j (session.run and tx.run inside managed
+transactions). Run from socapp/backend:
+
+    # against the database configured in .env (two existing user ids)
+    python -m benchmarks.send_roundtrips --sender <id> --recipient <id> --sends 200
+
+    # without a database: a stub driver answers every statement instantly,
+    # so only the round-trip count is meaningful
+    python -m benchmarks.send_roundtrips --stub
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core import database
+
+
+class _Counter:
+    statements = 0
+
+
+class _CountingTx:
+    def __init__(self, tx):
+        self._tx = tx
+
+    async def run(self, *args, **kwargs):
+        _Counter.statements += 1
+        return await self._tx.run(*args, **kwargs)
+
+
+class _CountingSession:
+    def __init__(self, session):
+        self._session = session
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._session.__aexit__(*exc)
+
+    async def run(self, *args, **kwargs):
+        _Counter.statements += 1
+        return await self._session.run(*args, **kwargs)
+
+    async def execute_write(self, work, *args, **kwargs):
+        return await self._session.execute_write(lambda tx, *a, **k: work(_CountingTx(tx), *a, **k), *args, **kwargs)
+
+
+class _StubResult:
+    def __init__(self, record):
+        self._record = record
+
+    async def single(self):
+        return self._record
+
+    def __aiter__(self):
+        async def gen():
+            if self._record:
+                yield self._record
+        return gen()
+
+
+class _StubSession:
+    """Answers every statement with a plausible send-path record."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, cypher, **params):
+        return _StubResult({
+            "conversation_id": params.get("cid"),
+            "recipient_id": params.get("rid"),
+            "recipient_unread": 1,
+            "id": params.get("mid"),
+            "content": params.get("content"),
+            "timestamp": params.get("now"),
+            "sender_id": params.get("sid"),
+        })
+
+    async def execute_write(self, work, *args, **kwargs):
+        return await work(self, *args, **kwargs)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sender", default="bench-sender")
+    parser.add_argument("--recipient", default="bench-recipient")
+    parser.add_argument("--sends", type=int, default=100)
+    parser.add_argument("--stub", action="store_true", help="use an in-process stub instead of Neo4j")
+    args = parser.parse_args()
+
+    if args.stub:
+        get_session = lambda: _CountingSession(_StubSession())
+    else:
+        real_get_session = database.async_db.get_session
+        get_session = lambda: _CountingSession(real_get_session())
+    database.async_db.get_session = get_session
+
+    # Imported after patching so the route sees the instrumented connection
+    from app.routes.messages import SendMessageRequest, send_and_create_if_needed
+
+    current_user = {"id": args.sender, "username": args.sender}
+    latencies = []
+    for i in range(args.sends):
+        body = SendMessageRequest(user_id=args.recipient, content=f"bench message {i}")
+        started = time.perf_counter()
+        await send_and_create_if_needed(body, current_user=current_user)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    print(f"sends:                {args.sends}")
+    print(f"round-trips per send: {_Counter.statements / args.sends:.2f}")
+    print(f"latency p50:          {statistics.median(latencies):.2f} ms")
+    print(f"latency p95:          {sorted(latencies)[int(len(latencies) * 0.95) - 1]:.2f} ms")
+    await database.close_drivers()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
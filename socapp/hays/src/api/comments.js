@@ -1,7 +1,10 @@
 import api from "./axios";
+import { pageOf } from "./pagination";
 
 // ✅ These match your FastAPI backend exactly
-export const getComments = (postId) => api.get(`/posts/${postId}/comments`);
+// Oldest-first page of comments; pass the previous page's nextCursor as `cursor`
+export const getComments = (postId, params = {}) =>
+  api.get(`/posts/${postId}/comments`, { params }).then(pageOf);
 export const addComment = (postId, data) => api.post(`/posts/${postId}/comments`, data);
 export const updateComment = (commentId, data) => api.put(`/posts/comments/${commentId}`, data);
 export const deleteComment = (commentId) => api.delete(`/posts/comments/${commentId}`);
@@ -0,0 +1,6 @@
+// Paginated list endpoints return a plain array and send the cursor for the
+// next page in the X-Next-Cursor header (axios lower-cases header names).
+export const pageOf = (res) => ({
+  items: res.data || [],
+  nextCursor: res.headers?.['x-next-cursor'] || null,
+});
@@ -1,6 +1,9 @@
 import api from './axios';
+import { pageOf } from './pagination';
 
 export const getFeed = () => api.get('/users/me/feed');
+// Newest-first page of posts; pass the previous page's nextCursor as `cursor`
+export const getPosts = (params = {}) => api.get('/posts/', { params }).then(pageOf);
 export const createPost = (data) => api.post('/posts/', data);
 export const likePost = (id) => api.post(`/posts/${id}/like`);
 export const getPost = (id) => api.get(`/posts/${id}`);
@@ -16,11 +16,14 @@ export default function CommentSection({ postId, onChanged }) {
   const [editText, setEditText] = useState('');
   const [savingEdit, setSavingEdit] = useState(false);
   const [deleteTarget, setDeleteTarget] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchComments = async () => {
     try {
-      const res = await getComments(postId);
-      setComments(res.data || []);
+      const page = await getComments(postId);
+      setComments(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error('❌ Failed to fetch comments:', err);
     } finally {
@@ -28,6 +31,24 @@ export default function CommentSection({ postId, onChanged }) {
     }
   };
 
+  // Comments are oldest-first, so later pages hold newer comments
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getComments(postId, { cursor: nextCursor });
+      setComments((prev) => {
+        const seen = new Set(prev.map((c) => c.id));
+        return [...prev, ...page.items.filter((c) => !seen.has(c.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('❌ Failed to load more comments:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const openEdit = (comment) => {
     setMenuOpenId(null);
     setEditTarget(comment);
@@ -193,6 +214,16 @@ export default function CommentSection({ postId, onChanged }) {
               </div>
             );
           })}
+          {nextCursor && (
+            <button
+              type="button"
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="w-full text-sm text-purple-600 hover:text-purple-800 py-2 transition-colors disabled:opacity-60"
+            >
+              {loadingMore ? 'Loading...' : 'Show more comments'}
+            </button>
+          )}
         </div>
       )}
 
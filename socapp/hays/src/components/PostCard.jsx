@@ -206,7 +206,7 @@ export default function PostCard({ post, onChanged, pinned = false }) {
         {post.image_url && (
           <div className="mb-4 rounded-2xl overflow-hidden border border-gray-200">
             <img
-              src={post.image_url} // Cloudinary URLs are always full URLs
+              src={post.image_feed_url || post.image_url} // Feed-width variant when the backend has one
               alt="post"
               className="w-full max-h-96 object-cover"
             />
@@ -21,10 +21,9 @@ export default function Sidebar() {
 
   const refreshUnread = async () => {
     try {
-      const res = await api.get('/messages/conversations', { params: { limit: 20, offset: 0 } });
-      const list = res.data || [];
-      const total = list.reduce((sum, c) => sum + (c.unread_count || 0), 0);
-      setUnreadTotal(total);
+      // Summed server-side over every conversation, not just the first inbox page
+      const res = await api.get('/messages/unread');
+      setUnreadTotal(res.data?.total || 0);
     } catch (_) {
       // noop
     }
@@ -35,8 +34,11 @@ export default function Sidebar() {
     const s = getSocket();
     const onIncoming = () => refreshUnread();
     s.on('message:new', onIncoming);
+    // Pushed to this user's room on new messages and reads elsewhere
+    s.on('unread:update', onIncoming);
     return () => {
       s.off('message:new', onIncoming);
+      s.off('unread:update', onIncoming);
     };
   }, []);
 
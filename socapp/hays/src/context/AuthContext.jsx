@@ -2,6 +2,7 @@ import React, { createContext, useContext, useEffect, useMemo, useState } from '
 import { useNavigate } from 'react-router-dom';
 import api from '../api/axios';
 import { useToast } from '../utils/Toast';
+import { disconnectSocket } from '../services/socket';
 
 const AuthContext = createContext(null);
 
@@ -138,6 +139,8 @@ export function AuthProvider({ children }) {
 
   const logout = () => {
     localStorage.removeItem('token');
+    // The socket is authenticated as this user; drop it with the token
+    disconnectSocket();
     setToken(null);
     setUser(null);
     setAuthLoading(false);
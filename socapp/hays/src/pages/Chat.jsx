@@ -4,6 +4,7 @@ import Sidebar from '@/components/Sidebar';
 import Navbar from '@/components/Navbar';
 import Avatar from '@/components/Avatar';
 import api from '@/api/axios';
+import { pageOf } from '@/api/pagination';
 import { getSocket } from '@/services/socket';
 import { useAuth } from '@/context/AuthContext';
 
@@ -16,6 +17,8 @@ export default function Chat() {
   const [loadingConvos, setLoadingConvos] = useState(true);
   const [messages, setMessages] = useState([]);
   const [loadingMsgs, setLoadingMsgs] = useState(false);
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const [input, setInput] = useState('');
   const [activeId, setActiveId] = useState(paramId || null);
   const [query, setQuery] = useState('');
@@ -26,6 +29,8 @@ export default function Chat() {
   const msgSeenRef = useRef(new Set());
   const sentMessageIdsRef = useRef(new Set());
   const readMarkedRef = useRef(new Set());
+  // Set while prepending older history so the view doesn't jump to the bottom
+  const keepScrollRef = useRef(false);
 
   const msgKey = (m) => String(m?.id || `${m?.timestamp || m?.created_at}-${m?.sender_id || ''}-${(m?.content || '').slice(0,16)}`);
 
@@ -194,11 +199,14 @@ export default function Chat() {
     (async () => {
       try {
         setLoadingMsgs(true);
-        // Expected backend: GET /messages?conversation_id=...
-        const res = await api.get('/messages', { params: { conversation_id: normalizeConvoId(activeId) } });
+        setOlderCursor(null);
+        // Expected backend: GET /messages?conversation_id=... (newest page;
+        // X-Next-Cursor is the `before` value for the next older page)
+        const page = pageOf(await api.get('/messages', { params: { conversation_id: normalizeConvoId(activeId) } }));
         if (!mounted) return;
-        const list = res.data || [];
+        const list = page.items;
         setMessages(list);
+        setOlderCursor(page.nextCursor);
         // Seed de-dup so socket echoes of history don't duplicate
         const next = new Set();
         for (const m of list) next.add(msgKey(m));
@@ -221,6 +229,25 @@ export default function Chat() {
     return () => { mounted = false; };
   }, [activeId]);
 
+  const loadOlder = async () => {
+    if (!activeId || !olderCursor) return;
+    setLoadingOlder(true);
+    try {
+      const page = pageOf(await api.get('/messages', {
+        params: { conversation_id: normalizeConvoId(activeId), before: olderCursor },
+      }));
+      const older = page.items.filter((m) => !msgSeenRef.current.has(msgKey(m)));
+      for (const m of older) msgSeenRef.current.add(msgKey(m));
+      keepScrollRef.current = true;
+      setMessages((prev) => [...older, ...prev]);
+      setOlderCursor(page.nextCursor);
+    } catch (e) {
+      console.error('Failed to load older messages', e);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   // Socket.IO real-time
   useEffect(() => {
     const socket = getSocket();
@@ -263,6 +290,10 @@ export default function Chat() {
 
   // Auto-scroll to bottom when messages change
   useEffect(() => {
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     bottomRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages]);
 
@@ -423,7 +454,19 @@ export default function Chat() {
                 ) : messages.length === 0 ? (
                   <div className="text-gray-600">No messages yet.</div>
                 ) : (
-                  messages.map((m) => {
+                  <>
+                  {olderCursor && (
+                    <div className="text-center">
+                      <button
+                        onClick={loadOlder}
+                        disabled={loadingOlder}
+                        className="text-xs px-3 py-1 rounded-full bg-purple-100 text-purple-700 hover:bg-purple-200 transition disabled:opacity-60"
+                      >
+                        {loadingOlder ? 'Loading...' : 'Load older messages'}
+                      </button>
+                    </div>
+                  )}
+                  {messages.map((m) => {
                     const mine = String(m.sender_id) === String(user?.id);
                     return (
                       <div key={m.id || `${m.timestamp || m.created_at}-${m.sender_id || ''}`} className={`flex items-end gap-2 ${mine ? 'justify-end' : ''}`}>
@@ -439,7 +482,8 @@ export default function Chat() {
                         )}
                       </div>
                     );
-                  })
+                  })}
+                  </>
                 )}
                 <div ref={bottomRef} />
               </div>
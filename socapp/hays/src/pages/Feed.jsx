@@ -2,20 +2,22 @@ import { useEffect, useState } from 'react';
 import CreatePost from '../components/CreatePost';
 import PostCard from '../components/PostCard';
 import Sidebar from '@/components/Sidebar';
-import api from '../api/axios';
+import { getPosts } from '../api/posts';
 
 export default function Feed() {
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  // Fetch all posts from backend
+  // Fetch the newest page of posts from backend
   const fetchPosts = async () => {
     try {
       if (!refreshing) setLoading(true);
-      const res = await api.get('/posts/');
-      const sorted = res.data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-      setPosts(sorted);
+      const page = await getPosts();
+      setPosts(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error('❌ Failed to load posts:', err);
     } finally {
@@ -24,6 +26,24 @@ export default function Feed() {
     }
   };
 
+  // Append the next (older) page
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPosts({ cursor: nextCursor });
+      setPosts((prev) => {
+        const seen = new Set(prev.map((p) => p.id));
+        return [...prev, ...page.items.filter((p) => !seen.has(p.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('❌ Failed to load more posts:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchPosts();
   }, []);
@@ -76,6 +96,17 @@ export default function Feed() {
                 {posts.map((post) => (
                   <PostCard key={post.id} post={post} onChanged={handlePostChanged} />
                 ))}
+                {nextCursor && (
+                  <div className="text-center">
+                    <button
+                      onClick={loadMore}
+                      disabled={loadingMore}
+                      className="text-sm px-4 py-2 rounded-full bg-purple-600 text-white hover:bg-purple-700 active:scale-95 transition disabled:opacity-60"
+                    >
+                      {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
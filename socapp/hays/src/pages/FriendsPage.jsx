@@ -3,12 +3,15 @@ import { useNavigate } from 'react-router-dom';
 import { FaUserPlus, FaUserCheck, FaUserTimes, FaSearch, FaUsers } from 'react-icons/fa';
 import { useAuth } from '@/context/AuthContext';
 import api from '@/api/axios';
+import { pageOf } from '@/api/pagination';
 import Sidebar from '@/components/Sidebar';
 import Avatar from '@/components/Avatar';
 
 export default function FriendsPage() {
   const [users, setUsers] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [followingSet, setFollowingSet] = useState(new Set());
   const [followersSet, setFollowersSet] = useState(new Set());
   const [query, setQuery] = useState('');
@@ -18,9 +21,11 @@ export default function FriendsPage() {
   const fetchData = async () => {
     setLoading(true);
     try {
+      // Friend status comes from /users/me, which carries the complete
+      // follower/following id lists; /users is only the first directory page
       const [usersRes, meRes] = await Promise.all([api.get('/users'), api.get('/users/me')]);
 
-      const all = Array.isArray(usersRes.data) ? usersRes.data : [];
+      const page = pageOf(usersRes);
       const mine = meRes.data;
 
       const following = new Set(mine.following_ids || []);
@@ -28,7 +33,8 @@ export default function FriendsPage() {
       setFollowingSet(following);
       setFollowersSet(followers);
 
-      setUsers(all.filter((u) => String(u.id) !== String(mine.id)));
+      setUsers(page.items.filter((u) => String(u.id) !== String(mine.id)));
+      setNextCursor(page.nextCursor);
     } catch (e) {
       console.error('Failed to load users', e);
     } finally {
@@ -40,6 +46,24 @@ export default function FriendsPage() {
     fetchData();
   }, []);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = pageOf(await api.get('/users', { params: { cursor: nextCursor } }));
+      setUsers((curr) => {
+        const seen = new Set(curr.map((u) => u.id));
+        const more = page.items.filter((u) => !seen.has(u.id) && String(u.id) !== String(me?.id));
+        return [...curr, ...more];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      console.error('Failed to load more users', e);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const toggleFollow = async (id, isFollowing) => {
     try {
       if (isFollowing) {
@@ -199,6 +223,17 @@ export default function FriendsPage() {
                 })}
               </div>
             )}
+            {!loading && nextCursor && (
+              <div className="text-center mt-6">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="text-sm px-4 py-2 rounded-full bg-purple-600 text-white hover:bg-purple-700 active:scale-95 transition disabled:opacity-60"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
@@ -2,6 +2,7 @@ import { useEffect, useMemo, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { FaUserPlus, FaUserCheck, FaUserTimes, FaSearch } from 'react-icons/fa';
 import api from '@/api/axios';
+import { pageOf } from '@/api/pagination';
 import { useAuth } from '@/context/AuthContext';
 import Sidebar from '@/components/Sidebar';
 
@@ -11,25 +12,40 @@ export default function PeoplePage() {
   const [users, setUsers] = useState([]);
   const [query, setQuery] = useState('');
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [busyIds, setBusyIds] = useState(new Set());
 
+  // One page of the directory; X-Next-Cursor points at the next one
+  const fetchPage = async (cursor) => {
+    const meId = me?.id;
+    const params = {};
+    if (meId) params.me = meId;
+    if (cursor) params.cursor = cursor;
+    return pageOf(await api.get('/users', { params }));
+  };
+
+  // Exclude self and dedupe by id to ensure only user profiles, no duplicates
+  const mergeUsers = (existing, raw) => {
+    const meId = me?.id;
+    const merged = [...existing];
+    const seen = new Set(existing.map((u) => u.id));
+    for (const u of raw) {
+      if (!u || !u.id) continue;
+      if (meId && u.id === meId) continue;
+      if (seen.has(u.id)) continue;
+      seen.add(u.id);
+      merged.push(u);
+    }
+    return merged;
+  };
+
   const fetchUsers = async () => {
     setLoading(true);
     try {
-      const meId = me?.id;
-      const res = await api.get('/users', { params: meId ? { me: meId } : {} });
-      const raw = Array.isArray(res.data) ? res.data : [];
-      // Exclude self and dedupe by id to ensure only user profiles, no duplicates
-      const deduped = [];
-      const seen = new Set();
-      for (const u of raw) {
-        if (!u || !u.id) continue;
-        if (meId && u.id === meId) continue;
-        if (seen.has(u.id)) continue;
-        seen.add(u.id);
-        deduped.push(u);
-      }
-      setUsers(deduped);
+      const page = await fetchPage(null);
+      setUsers(mergeUsers([], page.items));
+      setNextCursor(page.nextCursor);
     } catch (e) {
       console.error('Failed to fetch users', e);
     } finally {
@@ -37,6 +53,20 @@ export default function PeoplePage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setUsers((curr) => mergeUsers(curr, page.items));
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      console.error('Failed to load more users', e);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchUsers();
   }, [me?.id]);
@@ -193,6 +223,17 @@ export default function PeoplePage() {
                 })}
               </div>
             )}
+            {!loading && nextCursor && (
+              <div className="text-center mt-4">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="text-sm px-4 py-2 rounded-full bg-purple-600 text-white hover:bg-purple-700 active:scale-95 transition disabled:opacity-60"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
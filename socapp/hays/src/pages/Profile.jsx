@@ -4,6 +4,7 @@ import { getUser, followUser, unfollowUser, getMe } from '@/api/users';
 import PostCard from '@/components/PostCard';
 import { useToast } from '@/utils/Toast';
 import api from '@/api/axios';
+import { getPosts } from '@/api/posts';
 import Sidebar from '@/components/Sidebar';
 import { useAuth } from '@/context/AuthContext';
 import { getPinnedForUser } from '@/utils/pins';
@@ -22,6 +23,17 @@ export default function Profile() {
   const [followers, setFollowers] = useState([]);
   const [following, setFollowing] = useState([]);
   const [loadingList, setLoadingList] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // If viewing own profile, sort pinned to top
+  const pinnedFirst = (data) => {
+    if (!me || String(me.id) !== String(id)) return data;
+    const pinnedIds = new Set(getPinnedForUser(me.id));
+    const pin = data.filter((p) => pinnedIds.has(p.id));
+    const rest = data.filter((p) => !pinnedIds.has(p.id));
+    return [...pin, ...rest];
+  };
 
   const load = async () => {
     setLoading(true);
@@ -29,20 +41,12 @@ export default function Profile() {
       const [meRes, uRes, pRes] = await Promise.all([
         getMe(),
         getUser(id, me?.id),
-        api.get('/posts/', { params: { user_id: id } }),
+        getPosts({ user_id: id }),
       ]);
       setMeData(meRes.data);
       setUser(uRes.data);
-      const data = pRes.data;
-      // If viewing own profile, sort pinned to top
-      if (me && String(me.id) === String(id)) {
-        const pinnedIds = new Set(getPinnedForUser(me.id));
-        const pin = data.filter((p) => pinnedIds.has(p.id));
-        const rest = data.filter((p) => !pinnedIds.has(p.id));
-        setPosts([...pin, ...rest]);
-      } else {
-        setPosts(data);
-      }
+      setPosts(pinnedFirst(pRes.items));
+      setNextCursor(pRes.nextCursor);
     } catch (e) {
       toast.error('Failed to load profile');
     } finally {
@@ -50,6 +54,23 @@ export default function Profile() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPosts({ user_id: id, cursor: nextCursor });
+      setPosts((prev) => {
+        const seen = new Set(prev.map((p) => p.id));
+        return pinnedFirst([...prev, ...page.items.filter((p) => !seen.has(p.id))]);
+      });
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      toast.error('Failed to load more posts');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleMessage = async (e) => {
     e.preventDefault();
     e.stopPropagation();
@@ -110,7 +131,7 @@ export default function Profile() {
 
   const isSelf = me && String(me.id) === String(id);
   const followsMe = meData?.followers_ids?.includes?.(user.id);
-  const postsCount = posts.length;
+  const postsCount = nextCursor ? `${posts.length}+` : posts.length;
   const avatar = user.profile_pic || user.avatar_url || null;
 
   const loadFollowers = async () => {
@@ -225,6 +246,17 @@ export default function Profile() {
               {posts.map((p) => (
                 <PostCard key={p.id} post={p} onChanged={load} />
               ))}
+              {nextCursor && (
+                <div className="text-center">
+                  <button
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                    className="text-sm px-4 py-2 rounded-full bg-purple-600 text-white hover:bg-purple-700 active:scale-95 transition disabled:opacity-60"
+                  >
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         </div>
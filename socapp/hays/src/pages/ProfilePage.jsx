@@ -1,5 +1,6 @@
 import { useEffect, useRef, useState } from 'react';
 import api from '@/api/axios';
+import { getPosts } from '@/api/posts';
 import { useAuth } from '@/context/AuthContext';
 import CreatePost from '@/components/CreatePost';
 import PostCard from '@/components/PostCard';
@@ -18,6 +19,8 @@ export default function ProfilePage() {
   const [saving, setSaving] = useState(false);
   const [posts, setPosts] = useState([]);
   const [loadingPosts, setLoadingPosts] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [pinnedPosts, setPinnedPosts] = useState([]);
   const [loadingPins, setLoadingPins] = useState(true);
   const [showFollowers, setShowFollowers] = useState(false);
@@ -41,13 +44,31 @@ export default function ProfilePage() {
   const fetchMyPosts = async (id) => {
     setLoadingPosts(true);
     try {
-      const res = await api.get('/posts', { params: { user_id: id } });
-      setPosts(res.data || []);
+      const page = await getPosts({ user_id: id });
+      setPosts(page.items);
+      setNextCursor(page.nextCursor);
     } finally {
       setLoadingPosts(false);
     }
   };
 
+  const loadMorePosts = async () => {
+    if (!profile || !nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPosts({ user_id: profile.id, cursor: nextCursor });
+      setPosts((prev) => {
+        const seen = new Set(prev.map((p) => p.id));
+        return [...prev, ...page.items.filter((p) => !seen.has(p.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      console.error('Failed to load more posts', e);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchPinnedPosts = async (id) => {
     setLoadingPins(true);
     try {
@@ -156,7 +177,7 @@ export default function ProfilePage() {
   const followingCount = Array.isArray(profile.following_ids)
     ? profile.following_ids.length
     : profile.following_count || 0;
-  const postsCount = posts.length;
+  const postsCount = nextCursor ? `${posts.length}+` : posts.length;
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-purple-100 via-purple-200 to-indigo-100 px-4 py-6">
@@ -369,6 +390,17 @@ export default function ProfilePage() {
                   {posts.map((p) => (
                     <PostCard key={p.id} post={p} onChanged={() => fetchMyPosts(profile.id)} />
                   ))}
+                  {nextCursor && (
+                    <div className="text-center">
+                      <button
+                        onClick={loadMorePosts}
+                        disabled={loadingMore}
+                        className="px-4 py-2 rounded-xl bg-white border border-gray-200 text-gray-700 hover:bg-gray-50 transition-colors disabled:opacity-60"
+                      >
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -14,6 +14,9 @@ export function getSocket() {
     socket = io(url, {
       withCredentials: true,
       transports: ['websocket'],
+      // The server rejects connections without a valid JWT; read it on every
+      // (re)connect so a fresh login is picked up
+      auth: (cb) => cb({ token: localStorage.getItem('token') }),
     });
   }
   return socket;